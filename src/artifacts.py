@@ -0,0 +1,160 @@
+"""
+Pipeline run artifacts consumed by the report builder.
+
+An artifact directory holds the outputs of the latest modeling run:
+- metrics.csv : Model / MAE / RMSE / R2 summary (e.g. `cross_validate`)
+- folds.csv   : per-fold metrics and timings (optional)
+- soh.csv     : checkup-level SOH table (optional)
+- run.json    : split scheme, stage timings, feature columns and model
+                types/parameters
+- models/     : pickled models (<model_name>_model.pkl)
+
+Every file is replaced atomically, so readers never see a partial run.
+"""
+from pathlib import Path
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .io_utils import atomic_write_csv, atomic_write_text
+except ImportError:
+    from io_utils import atomic_write_csv, atomic_write_text
+
+DEFAULT_ARTIFACT_DIR = Path("../artifacts")
+
+
+def model_slug(name: str) -> str:
+    """
+    File-name form of a model name ("Random Forest" -> "random_forest").
+    """
+    return "_".join(name.lower().split())
+
+
+def _json_value(value):
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return repr(value)
+
+
+def describe_model(model) -> dict:
+    """
+    Type and explicitly set parameters of a fitted estimator.
+    """
+    cls = type(model)
+    params = {}
+    if hasattr(model, "get_params"):
+        defaults = cls().get_params() if hasattr(cls, "get_params") else {}
+        params = {
+            key: _json_value(value)
+            for key, value in sorted(model.get_params().items())
+            if value is not None and value == value and defaults.get(key) != value
+        }
+    # Public module path: sklearn.ensemble._forest -> sklearn.ensemble
+    module = ".".join(part for part in cls.__module__.split(".") if not part.startswith("_"))
+    return {"type": f"{module}.{cls.__name__}", "params": params}
+
+
+def save_run_artifacts(
+    artifact_dir: str | Path,
+    summary_df: pd.DataFrame,
+    folds_df: pd.DataFrame | None = None,
+    soh_df: pd.DataFrame | None = None,
+    models: dict | None = None,
+    timings: dict | None = None,
+    scheme: str | None = None,
+    feature_columns=None,
+) -> Path:
+    """
+    Write the artifacts of a modeling run.
+
+    Parameters
+    ----------
+    artifact_dir : str or Path
+        Destination directory
+    summary_df : pd.DataFrame
+        One row per model with `Model`, `MAE`, `RMSE`, `R2`
+    folds_df : pd.DataFrame, optional
+        Per-fold metrics
+    soh_df : pd.DataFrame, optional
+        Checkup-level SOH table
+    models : dict, optional
+        Model name -> fitted model (pickled and described in run.json)
+    timings : dict, optional
+        Stage name -> seconds
+    scheme : str, optional
+        Split scheme of the metrics ("loco", "rolling", ...)
+    feature_columns : list of str, optional
+        Model input columns, in order (defaults to a model's
+        `feature_schema_`, see `modeling.train_on_feature_matrix`)
+
+    Returns
+    -------
+    Path
+        Artifact directory
+    """
+    artifact_dir = Path(artifact_dir)
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+
+    atomic_write_csv(summary_df, artifact_dir / "metrics.csv")
+    if folds_df is not None:
+        atomic_write_csv(folds_df, artifact_dir / "folds.csv")
+    if soh_df is not None:
+        atomic_write_csv(soh_df, artifact_dir / "soh.csv")
+
+    described = {}
+    for name, model in (models or {}).items():
+        path = artifact_dir / "models" / f"{model_slug(name)}_model.pkl"
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(model, f)
+        os.replace(tmp, path)
+        described[name] = dict(describe_model(model), file=path.name)
+        schema = getattr(model, "feature_schema_", getattr(model, "feature_names_in_", None))
+        if schema is not None:
+            described[name]["features"] = [str(c) for c in schema]
+            feature_columns = feature_columns or described[name]["features"]
+
+    run = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "scheme": scheme,
+        "feature_columns": list(feature_columns) if feature_columns is not None else None,
+        "timings": {key: float(value) for key, value in (timings or {}).items()},
+        "models": described,
+    }
+    atomic_write_text(json.dumps(run, indent=2), artifact_dir / "run.json")
+    print(f"  Run artifacts saved: {artifact_dir}")
+    return artifact_dir
+
+
+def load_run_artifacts(artifact_dir: str | Path = DEFAULT_ARTIFACT_DIR) -> dict:
+    """
+    Load a run's artifacts; missing entries are None.
+
+    Returns
+    -------
+    dict
+        metrics, folds, soh (DataFrames) and run (dict)
+    """
+    artifact_dir = Path(artifact_dir)
+
+    def csv(name):
+        path = artifact_dir / name
+        # Exact float parsing: re-saving a loaded table must not change
+        # its text (and with it the report input hashes)
+        return pd.read_csv(path, float_precision="round_trip") if path.exists() else None
+
+    run_path = artifact_dir / "run.json"
+    return {
+        "metrics": csv("metrics.csv"),
+        "folds": csv("folds.csv"),
+        "soh": csv("soh.csv"),
+        "run": json.loads(run_path.read_text()) if run_path.exists() else None,
+    }
@@ -0,0 +1,249 @@
+"""
+Thread-safe, memory-bounded LRU cache for per-cell intermediate results.
+
+Entries are keyed by (source frame, its content hash, cell_id, checkup
+range, stage, params) and evicted least-recently-used first once their
+total size exceeds the byte budget. Caching is opt-in: hashing a frame
+costs O(rows), so it pays off for per-cell results that are costlier to
+recompute than that, queried repeatedly from the same frame.
+"""
+from collections import OrderedDict, deque
+import sys
+import threading
+import uuid
+import weakref
+
+import numpy as np
+import pandas as pd
+
+try:
+    from .preprocessing import get_group_index
+except ImportError:
+    from preprocessing import get_group_index
+
+
+def estimate_nbytes(value) -> int:
+    """
+    Approximate in-memory size of a cached value in bytes.
+    """
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """
+    Byte-bounded LRU cache, safe to share between threads.
+
+    Concurrent `get_or_compute` calls for the same missing key run the
+    computation once; the other callers wait for its result.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._nbytes = 0
+        # Tokens of garbage-collected frames whose entries are still held
+        self._dead_tokens = deque()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _caches.add(self)
+
+    def _purge_dead_locked(self) -> None:
+        dead = set()
+        while self._dead_tokens:
+            dead.add(self._dead_tokens.popleft())
+        if not dead:
+            return
+        for key in [k for k in self._entries if isinstance(k, tuple) and k and k[0] in dead]:
+            self._nbytes -= self._entries.pop(key)[1]
+
+    def purge_token(self, token: str) -> None:
+        """
+        Drop the entries derived from a frame that no longer exists.
+
+        Safe to call from a weakref callback: if the cache is busy the
+        purge is deferred to the next `put`.
+        """
+        self._dead_tokens.append(token)
+        if self._lock.acquire(blocking=False):
+            try:
+                self._purge_dead_locked()
+            finally:
+                self._lock.release()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+            return default
+
+    def put(self, key, value) -> None:
+        size = estimate_nbytes(value)
+        with self._lock:
+            self._purge_dead_locked()
+            if key in self._entries:
+                self._nbytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._nbytes += size
+            while self._nbytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._nbytes -= evicted
+                self.evictions += 1
+
+    def get_or_compute(self, key, func):
+        """
+        Return the cached value for `key`, computing it with `func()` on a miss.
+        """
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+                event = self._in_flight.get(key)
+                if event is None:
+                    self.misses += 1
+                    event = self._in_flight[key] = threading.Event()
+                    break
+            # Another thread is computing this key
+            event.wait()
+
+        try:
+            value = func()
+            self.put(key, value)
+            return value
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            event.set()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "nbytes": self._nbytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Frames get a stable token while alive; the weakref check guards against
+# id() reuse after a frame is garbage collected.
+_frame_tokens = {}
+_frame_tokens_lock = threading.Lock()
+_caches = weakref.WeakSet()
+
+
+def _frame_collected(key, token) -> None:
+    _frame_tokens.pop(key, None)
+    for cache in list(_caches):
+        cache.purge_token(token)
+
+
+def frame_token(df: pd.DataFrame) -> str:
+    """
+    Stable identifier of a DataFrame object for use in cache keys.
+
+    Tokens identify the object, not its contents (see `frame_version`);
+    entries under a token are purged once the frame is garbage collected.
+    """
+    with _frame_tokens_lock:
+        entry = _frame_tokens.get(id(df))
+        if entry is not None and entry[0]() is df:
+            return entry[1]
+        token = uuid.uuid4().hex
+        key = id(df)
+        ref = weakref.ref(df, lambda _, key=key, token=token: _frame_collected(key, token))
+        _frame_tokens[key] = (ref, token)
+        return token
+
+
+def frame_version(df: pd.DataFrame) -> int:
+    """
+    Content hash of a frame (values, index and column names), so results
+    cached before an in-place mutation are not served afterwards.
+    """
+    values = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    return hash((int(values.sum()), len(values), tuple(df.columns)))
+
+
+def make_key(df, cell_id, checkup_range=None, stage="slice", **params) -> tuple:
+    """
+    Cache key for a per-cell result derived from `df`.
+    """
+    return (
+        frame_token(df),
+        frame_version(df),
+        cell_id,
+        tuple(checkup_range) if checkup_range is not None else None,
+        stage,
+        tuple(sorted(params.items())),
+    )
+
+
+DEFAULT_CACHE = LRUCache()
+
+
+def cell_slice(
+    df: pd.DataFrame,
+    cell_id,
+    checkup_range=None,
+    cache: LRUCache | None = None,
+) -> pd.DataFrame:
+    """
+    Rows of one cell sorted by checkup_num, served from `cache` when possible.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Frame with `cell_id` and `checkup_num`
+    cell_id : str
+    checkup_range : tuple of (first, last), optional
+        Inclusive checkup_num bounds
+    cache : LRUCache, optional
+        Cache to use (e.g. `DEFAULT_CACHE`); by default the slice is
+        computed directly
+
+    Returns
+    -------
+    pd.DataFrame
+        Treat as read-only: with a cache the same object is returned on
+        every hit
+    """
+    def compute():
+        index = get_group_index(df)
+        if index is not None:
+            return df.iloc[index.cell_rows(cell_id, checkup_range)]
+        mask = df["cell_id"] == cell_id
+        if checkup_range is not None:
+            mask &= df["checkup_num"].between(*checkup_range)
+        return df[mask].sort_values("checkup_num")
+
+    if cache is None:
+        return compute()
+    return cache.get_or_compute(make_key(df, cell_id, checkup_range), compute)
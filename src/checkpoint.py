@@ -0,0 +1,157 @@
+"""
+Checkpoint and resume for long multi-cell pipeline runs.
+
+Completed (cell_id, checkup_num, stage) units are recorded in a small
+SQLite manifest together with the signature of their source file. Each
+unit's output is written atomically (temporary file + rename), so a run
+killed at any point leaves only whole outputs behind; a rerun skips the
+recorded units and continues with the first incomplete one.
+
+The final SOH table is always rebuilt from the per-checkup outputs in a
+fixed order, so a resumed run produces byte-identical results to an
+uninterrupted one.
+"""
+from pathlib import Path
+import sqlite3
+
+import pandas as pd
+
+from io_utils import atomic_write_csv, load_csv, parse_checkup_filename
+from pipeline import bounded_map, featurize_checkup_file
+from soh import compute_bol_capacity, compute_soh, compute_soh_delta, flag_eol
+
+FEATURE_STAGE = "features"
+SOH_STAGE = "soh"
+
+
+def file_signature(path: str | Path) -> str:
+    stat = Path(path).stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class CheckpointManifest:
+    """
+    SQLite record of completed pipeline units.
+    """
+
+    def __init__(self, db_path: str | Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path)
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS units (
+                    cell_id TEXT NOT NULL,
+                    checkup_num INTEGER NOT NULL,
+                    stage TEXT NOT NULL,
+                    source_signature TEXT,
+                    output_path TEXT NOT NULL,
+                    PRIMARY KEY (cell_id, checkup_num, stage)
+                )
+                """
+            )
+
+    def is_done(self, cell_id, checkup_num, stage, source_signature=None) -> bool:
+        """
+        True if the unit is recorded, its source is unchanged and its
+        output still exists.
+        """
+        row = self._conn.execute(
+            "SELECT source_signature, output_path FROM units "
+            "WHERE cell_id = ? AND checkup_num = ? AND stage = ?",
+            (cell_id, int(checkup_num), stage),
+        ).fetchone()
+        if row is None or not Path(row[1]).exists():
+            return False
+        return source_signature is None or row[0] == source_signature
+
+    def mark_done(self, cell_id, checkup_num, stage, output_path, source_signature=None) -> None:
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO units VALUES (?, ?, ?, ?, ?)",
+                (cell_id, int(checkup_num), stage, source_signature, str(output_path)),
+            )
+
+    def completed(self, stage: str) -> list:
+        return self._conn.execute(
+            "SELECT cell_id, checkup_num FROM units WHERE stage = ? "
+            "ORDER BY cell_id, checkup_num",
+            (stage,),
+        ).fetchall()
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _feature_unit(task):
+    source, output = task
+    atomic_write_csv(featurize_checkup_file(source), output)
+    return task
+
+
+def run_checkpointed(
+    paths,
+    work_dir: str | Path,
+    output_path: str | Path,
+    max_workers: int = 4,
+) -> pd.DataFrame:
+    """
+    Run file -> checkup features -> SOH with checkpoint/resume.
+
+    Parameters
+    ----------
+    paths : iterable of str or Path
+        Raw checkup files (AC01_CheckUp01_... naming)
+    work_dir : str or Path
+        Directory for the manifest and per-checkup outputs
+    output_path : str or Path
+        Final SOH table CSV
+    max_workers : int
+        Feature extraction worker processes
+
+    Returns
+    -------
+    pd.DataFrame
+        Final SOH table
+    """
+    work_dir = Path(work_dir)
+    manifest = CheckpointManifest(work_dir / "manifest.sqlite")
+    try:
+        units = {}
+        for path in sorted(Path(p) for p in paths):
+            cell_id, checkup_num = parse_checkup_filename(path)
+            if (cell_id, checkup_num) in units:
+                raise ValueError(f"Duplicate checkup file for {cell_id} CheckUp{checkup_num}")
+            units[(cell_id, checkup_num)] = path
+
+        todo = []
+        for (cell_id, checkup_num), path in units.items():
+            output = work_dir / FEATURE_STAGE / f"{cell_id}_{checkup_num:04d}.csv"
+            signature = file_signature(path)
+            if not manifest.is_done(cell_id, checkup_num, FEATURE_STAGE, signature):
+                todo.append((cell_id, checkup_num, path, output, signature))
+
+        print(f"Checkpoint: {len(units) - len(todo)}/{len(units)} checkups done, {len(todo)} to run")
+        tasks = [(str(path), str(output)) for _, _, path, output, _ in todo]
+        for (cell_id, checkup_num, _, output, signature), _ in zip(
+            todo, bounded_map(_feature_unit, tasks, max_workers)
+        ):
+            manifest.mark_done(cell_id, checkup_num, FEATURE_STAGE, output, signature)
+
+        # Rebuild the final table in a fixed order from the unit outputs
+        outputs = [
+            work_dir / FEATURE_STAGE / f"{cell_id}_{checkup_num:04d}.csv"
+            for cell_id, checkup_num in sorted(units)
+        ]
+        cycles = (
+            pd.concat([load_csv(p) for p in outputs], ignore_index=True)
+            .sort_values(["cell_id", "checkup_num"])
+            .reset_index(drop=True)
+        )
+        soh_df = flag_eol(compute_soh_delta(compute_soh(cycles, compute_bol_capacity(cycles))))
+        atomic_write_csv(soh_df, output_path)
+        manifest.mark_done("*", -1, SOH_STAGE, output_path)
+        return soh_df
+    finally:
+        manifest.close()
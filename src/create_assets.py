@@ -14,6 +14,8 @@ import os
 import matplotlib.pyplot as plt
 from matplotlib.patches import FancyBboxPatch
 
+from reports import draw_static_figures
+
 ASSETS_DIR = "../assets"
 os.makedirs(ASSETS_DIR, exist_ok=True)
 
@@ -123,7 +125,5 @@ def system_concept():
 
 
 if __name__ == "__main__":
-    pipeline_overview()
-    model_architecture()
-    system_concept()
-    print("High-quality assets generated successfully.")
+    # Redraw only diagrams whose file is missing or whose code changed
+    draw_static_figures([pipeline_overview, model_architecture, system_concept], ASSETS_DIR)
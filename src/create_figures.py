@@ -9,6 +9,8 @@ import os
 import matplotlib.pyplot as plt
 from matplotlib.patches import FancyBboxPatch
 
+from reports import draw_static_figures
+
 FIGURES_DIR = "../figures"
 os.makedirs(FIGURES_DIR, exist_ok=True)
 
@@ -90,6 +92,5 @@ def evaluation_workflow():
 
 
 if __name__ == "__main__":
-    training_workflow()
-    evaluation_workflow()
-    print("High-quality figures generated successfully.")
+    # Redraw only diagrams whose file is missing or whose code changed
+    draw_static_figures([training_workflow, evaluation_workflow], FIGURES_DIR)
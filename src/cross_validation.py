@@ -0,0 +1,167 @@
+"""
+Parallel out-of-sample evaluation of the SOH models.
+
+Two split schemes:
+- leave-one-cell-out: train on all other cells, test on the held-out cell
+- rolling-origin: train on checkups <= t, test on checkups > t
+
+Every (fold, model) pair is one task in a process pool. The features are
+shared with the workers through a memory-mapped feature store, and the
+per-fold metrics come from `evaluation.evaluate_regression`. The summary
+has the same Model / MAE / RMSE / R2 layout that
+`visualization.plot_model_performance_comparison` expects.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import time
+
+import numpy as np
+import pandas as pd
+
+from evaluation import evaluate_regression
+from feature_store import load_feature_matrix, temporary_feature_store
+from modeling import train_linear_regression, train_random_forest, train_xgboost
+
+DEFAULT_TRAINERS = {
+    "Linear Regression": train_linear_regression,
+    "Random Forest": train_random_forest,
+    "XGBoost": train_xgboost,
+}
+
+# Per-process feature matrix set by _init_worker
+_worker = {}
+
+
+def leave_one_cell_out_splits(rows: pd.DataFrame) -> list:
+    """
+    (fold, train_idx, test_idx) holding out one cell per fold.
+    """
+    cells = rows["cell_id"].to_numpy()
+    return [
+        (f"cell={cell}", np.flatnonzero(cells != cell), np.flatnonzero(cells == cell))
+        for cell in sorted(np.unique(cells))
+    ]
+
+
+def rolling_origin_splits(
+    rows: pd.DataFrame, min_train_checkups: int = 3, horizon: int | None = None
+) -> list:
+    """
+    (fold, train_idx, test_idx) with train checkups <= t and test > t.
+
+    Parameters
+    ----------
+    rows : pd.DataFrame
+        `cell_id` / `checkup_num` of every row
+    min_train_checkups : int
+        Distinct checkups required before the first origin
+    horizon : int, optional
+        Only test on checkups t < c <= t + horizon
+    """
+    checkups = rows["checkup_num"].to_numpy()
+    origins = np.unique(checkups)[min_train_checkups - 1:-1]
+    splits = []
+    for t in origins:
+        test = checkups > t
+        if horizon is not None:
+            test &= checkups <= t + horizon
+        splits.append((f"origin={t}", np.flatnonzero(checkups <= t), np.flatnonzero(test)))
+    return splits
+
+
+def _init_worker(store_path):
+    _worker["fm"] = load_feature_matrix(store_path)
+
+
+def _fold_task(task):
+    fold, model_name, train_fn, train_idx, test_idx = task
+    fm = _worker["fm"]
+
+    start = time.perf_counter()
+    model = train_fn(fm.X[train_idx], fm.y[train_idx])
+    fit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(fm.X[test_idx])
+    predict_s = time.perf_counter() - start
+
+    metrics = evaluate_regression(fm.y[test_idx], y_pred)
+    return {
+        "fold": fold,
+        "Model": model_name,
+        "n_train": len(train_idx),
+        "n_test": len(test_idx),
+        **{key: float(value) for key, value in metrics.items()},
+        "fit_s": fit_s,
+        "predict_s": predict_s,
+    }
+
+
+def cross_validate(
+    fm,
+    scheme: str = "loco",
+    trainers: dict | None = None,
+    max_workers: int | None = None,
+    **split_kwargs,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Evaluate every trainer on every fold of a split scheme in parallel.
+
+    Parameters
+    ----------
+    fm : FeatureMatrix
+        Features, target and (cell_id, checkup_num) rows
+    scheme : {"loco", "rolling"}
+        Leave-one-cell-out or rolling-origin splits
+    trainers : dict, optional
+        Model name -> `modeling.train_*` function (defaults to all three)
+    max_workers : int, optional
+        Worker processes (defaults to the CPU count)
+    **split_kwargs
+        Passed to `rolling_origin_splits`
+
+    Returns
+    -------
+    tuple of (folds_df, summary_df)
+        Per-fold metrics and timings; mean/std per model
+    """
+    if fm.y is None:
+        raise ValueError("FeatureMatrix has no target")
+    trainers = trainers or DEFAULT_TRAINERS
+    if scheme == "loco":
+        splits = leave_one_cell_out_splits(fm.rows)
+    elif scheme == "rolling":
+        splits = rolling_origin_splits(fm.rows, **split_kwargs)
+    else:
+        raise ValueError(f"Unknown split scheme: {scheme}")
+    splits = [s for s in splits if len(s[1]) and len(s[2])]
+    if not splits:
+        raise ValueError("No non-empty folds for this data")
+
+    tasks = [
+        (fold, name, train_fn, train_idx, test_idx)
+        for fold, train_idx, test_idx in splits
+        for name, train_fn in trainers.items()
+    ]
+
+    start = time.perf_counter()
+    with temporary_feature_store(fm) as store:
+        with ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_init_worker, initargs=(store,)
+        ) as pool:
+            folds_df = pd.DataFrame(list(pool.map(_fold_task, tasks)))
+    wall_s = time.perf_counter() - start
+
+    summary_df = (
+        folds_df.groupby("Model", sort=False)
+        .agg(
+            MAE=("MAE", "mean"),
+            RMSE=("RMSE", "mean"),
+            R2=("R2", "mean"),
+            R2_std=("R2", "std"),
+            folds=("fold", "size"),
+            fit_s=("fit_s", "sum"),
+        )
+        .reset_index()
+    )
+    summary_df["wall_s"] = wall_s
+    return folds_df, summary_df
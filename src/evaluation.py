@@ -11,3 +11,18 @@ def evaluate_regression(y_true, y_pred) -> dict:
         "RMSE": np.sqrt(mean_squared_error(y_true, y_pred)),
         "R2": r2_score(y_true, y_pred),
     }
+
+
+def evaluate_update_drift(updated_model, refit_model, X, y) -> dict:
+    """
+    Compare an incrementally updated model with a full refit on the same data.
+
+    Returns the metrics of both models and the drift (updated - refit).
+    """
+    updated = evaluate_regression(y, updated_model.predict(X))
+    refit = evaluate_regression(y, refit_model.predict(X))
+    return {
+        "updated": updated,
+        "refit": refit,
+        "drift": {key: updated[key] - refit[key] for key in updated},
+    }
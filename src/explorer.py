@@ -0,0 +1,310 @@
+"""
+Interactive HTML SOH explorer (Plotly, WebGL).
+
+Produces a small static site:
+- index.html        : fleet SOH trend and capacity fade for every cell
+                      (one WebGL trace per panel) plus links to cell pages
+- cells/<cell>.html : SOH, capacity and raw V-Q discharge curves of one
+                      cell, with a resolution selector
+- cells/<cell>.L<n>.js : V-Q curves of one cell at one decimation level,
+                      loaded by the page when that level is selected
+- plotly.min.js     : shared once by all pages
+
+Raw V-Q curves are never embedded at full size. Min/max bucket
+decimation, which keeps the voltage extremes of every bucket, is
+precomputed in Python at a few resolution levels. Only the coarsest level
+is embedded in the page; finer levels are separate script files (they
+load from file:// too, unlike fetched JSON), so page size is bounded by
+the coarsest level.
+
+plotly is an optional dependency (see requirements.txt).
+"""
+from pathlib import Path
+import html
+import json
+
+import numpy as np
+import pandas as pd
+
+from cache import cell_slice
+from feature_engineering import compute_delta_time, integrate_discharge_capacity
+
+# Max buckets per checkup curve; each bucket keeps its min and max point
+DECIMATION_LEVELS = (250, 1000, 4000)
+
+
+def _require_plotly():
+    try:
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+    except ImportError as exc:
+        raise ImportError(
+            "The interactive explorer requires plotly (pip install plotly)"
+        ) from exc
+    return go, make_subplots
+
+
+def decimate_minmax(y: np.ndarray, codes: np.ndarray, n_buckets: int) -> np.ndarray:
+    """
+    Indices of points kept by min/max bucket decimation, per group.
+
+    Each group (sorted, contiguous `codes`) is split into up to
+    `n_buckets` equal-count buckets and the minimum and maximum of `y` in
+    every bucket are kept, in original order. Groups with at most
+    2 * n_buckets points are kept whole.
+    """
+    n = len(y)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    sizes = np.diff(np.r_[starts, n])
+    group = np.repeat(np.arange(len(starts)), sizes)
+    local = np.arange(n) - starts[group]
+
+    buckets = np.minimum(sizes, n_buckets)[group]
+    bucket_id = group.astype(np.int64) * n_buckets + local * buckets // sizes[group]
+
+    order = np.lexsort((y, bucket_id))
+    sorted_ids = bucket_id[order]
+    first = np.r_[True, sorted_ids[1:] != sorted_ids[:-1]]
+    last = np.r_[sorted_ids[1:] != sorted_ids[:-1], True]
+    keep = np.unique(np.r_[order[first], order[last]])
+
+    small = (sizes <= 2 * n_buckets)[group]
+    return np.union1d(keep, np.flatnonzero(small))
+
+
+def _soh_percent(df: pd.DataFrame) -> pd.Series:
+    if "soh_percentage" in df.columns:
+        return df["soh_percentage"]
+    return df["soh"] * 100
+
+
+def _capacity_column(df: pd.DataFrame) -> str:
+    for col in ("max_capacity_mah", "discharge_capacity_ah"):
+        if col in df.columns:
+            return col
+    raise ValueError("No capacity column (max_capacity_mah / discharge_capacity_ah)")
+
+
+def _joined_lines(soh_df: pd.DataFrame, y: pd.Series):
+    """
+    All cells as one NaN-separated line (one WebGL trace for the fleet).
+    """
+    df = soh_df.assign(_y=y.to_numpy()).sort_values(["cell_id", "checkup_num"])
+    new_cell = np.r_[False, df["cell_id"].to_numpy()[1:] != df["cell_id"].to_numpy()[:-1]]
+    pos = np.arange(len(df)) + np.cumsum(new_cell)
+    size = len(df) + new_cell.sum()
+
+    x = np.full(size, np.nan)
+    yy = np.full(size, np.nan)
+    cells = np.full(size, "", dtype=object)
+    x[pos] = df["checkup_num"].to_numpy(dtype=float)
+    yy[pos] = df["_y"].to_numpy(dtype=float)
+    cells[pos] = df["cell_id"].to_numpy()
+    return x, yy, cells
+
+
+def _fleet_figure(soh_df: pd.DataFrame):
+    go, make_subplots = _require_plotly()
+    capacity_col = _capacity_column(soh_df)
+
+    fig = make_subplots(rows=1, cols=2, subplot_titles=("SOH Trend", "Capacity Fade"))
+    for col, y, label in (
+        (1, _soh_percent(soh_df), "SOH (%)"),
+        (2, soh_df[capacity_col], capacity_col),
+    ):
+        x, yy, cells = _joined_lines(soh_df, y)
+        fig.add_trace(
+            go.Scattergl(
+                x=x, y=yy, customdata=cells, mode="lines+markers",
+                line=dict(width=1), marker=dict(size=3), opacity=0.6,
+                hovertemplate="%{customdata}<br>checkup %{x}<br>%{y:.3f}<extra></extra>",
+                showlegend=False,
+            ),
+            row=1, col=col,
+        )
+        fig.update_xaxes(title_text="Checkup Number", row=1, col=col)
+        fig.update_yaxes(title_text=label, row=1, col=col)
+
+    fig.add_hline(y=80, line_dash="dash", line_color="red", row=1, col=1)
+    fig.add_hline(y=85, line_dash="dash", line_color="orange", row=1, col=1)
+    fig.update_layout(title="Fleet State of Health", height=500, template="plotly_white")
+    return fig
+
+
+def _vq_curves(cell_raw: pd.DataFrame):
+    """
+    Discharged capacity (Ah), voltage and group codes per checkup.
+    """
+    cell_raw = cell_raw.sort_values(["checkup_num", "time_s"])
+    if "dQ_ah" not in cell_raw.columns:
+        cell_raw = integrate_discharge_capacity(compute_delta_time(cell_raw))
+    checkups = cell_raw["checkup_num"].to_numpy()
+    codes = np.r_[0, np.cumsum(checkups[1:] != checkups[:-1])]
+    q = cell_raw.groupby("checkup_num", sort=False)["dQ_ah"].cumsum().to_numpy()
+    return q, cell_raw["voltage_v"].to_numpy(dtype=float), codes, checkups
+
+
+# Swap the V-Q traces to a level's data when its menu button is clicked
+_LEVEL_LOADER = """
+var gd = document.getElementById('{plot_id}');
+window.sohLevels = window.sohLevels || {};
+gd.on('plotly_buttonclicked', function (e) {
+    var src = e.button.args[0];
+    var apply = function () {
+        var level = window.sohLevels[src];
+        Plotly.restyle(gd, {x: level.x, y: level.y}, level.traces);
+    };
+    if (window.sohLevels[src]) { apply(); return; }
+    var script = document.createElement('script');
+    script.src = src;
+    script.onload = apply;
+    document.head.appendChild(script);
+});
+"""
+
+
+def _level_script(src: str, traces, curves) -> str:
+    data = {
+        "traces": traces,
+        "x": [np.round(x, 6).tolist() for x, _ in curves],
+        "y": [np.round(y, 6).tolist() for _, y in curves],
+    }
+    payload = json.dumps(data, separators=(",", ":"))
+    return f"(window.sohLevels = window.sohLevels || {{}})[{json.dumps(src)}] = {payload};\n"
+
+
+def _cell_figure(cell_id, cell_soh: pd.DataFrame, cell_raw: pd.DataFrame | None, levels):
+    """
+    Cell figure with the coarsest V-Q level embedded, plus
+    {script file name: contents} of every level.
+    """
+    go, make_subplots = _require_plotly()
+    from plotly.colors import sample_colorscale
+
+    rows = 2 if cell_raw is not None and len(cell_raw) else 1
+    fig = make_subplots(
+        rows=rows, cols=2,
+        specs=[[{}, {}]] + ([[{"colspan": 2}, None]] if rows == 2 else []),
+        subplot_titles=("SOH Trend", "Capacity Fade") + (("Discharge V-Q Curves",) if rows == 2 else ()),
+        vertical_spacing=0.12,
+    )
+    capacity_col = _capacity_column(cell_soh)
+    for col, y in ((1, _soh_percent(cell_soh)), (2, cell_soh[capacity_col])):
+        fig.add_trace(
+            go.Scattergl(x=cell_soh["checkup_num"], y=y, mode="lines+markers", showlegend=False),
+            row=1, col=col,
+        )
+    fig.add_hline(y=80, line_dash="dash", line_color="red", row=1, col=1)
+    n_fixed = len(fig.data)
+
+    scripts = {}
+    if rows == 2:
+        q, v, codes, checkups = _vq_curves(cell_raw)
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        colors = sample_colorscale("Viridis", np.linspace(0, 1, max(len(starts), 2)))
+        traces = list(range(n_fixed, n_fixed + len(starts)))
+
+        buttons = []
+        for level_pos, n_buckets in enumerate(levels):
+            keep = decimate_minmax(v, codes, n_buckets)
+            bounds = np.searchsorted(codes[keep], np.arange(len(starts) + 1))
+            curves = [
+                (q[keep[bounds[g]:bounds[g + 1]]], v[keep[bounds[g]:bounds[g + 1]]])
+                for g in range(len(starts))
+            ]
+            src = f"{cell_id}.L{n_buckets}.js"
+            scripts[src] = _level_script(src, traces, curves)
+            buttons.append(dict(label=f"{len(keep):,} pts", method="skip", args=[src]))
+
+            if level_pos == 0:
+                for g, (x, y) in enumerate(curves):
+                    fig.add_trace(
+                        go.Scattergl(
+                            x=x, y=y, mode="lines",
+                            line=dict(width=1, color=colors[g]),
+                            name=f"CheckUp{checkups[starts[g]]}",
+                        ),
+                        row=2, col=1,
+                    )
+
+        fig.update_xaxes(title_text="Discharged Capacity (Ah)", row=2, col=1)
+        fig.update_yaxes(title_text="Voltage (V)", row=2, col=1)
+        fig.update_layout(updatemenus=[dict(
+            buttons=buttons, direction="down", x=1.0, xanchor="right", y=1.08, yanchor="bottom",
+        )])
+
+    fig.update_layout(
+        title=f"{cell_id} - State of Health",
+        height=450 * rows,
+        template="plotly_white",
+    )
+    return fig, scripts
+
+
+def build_soh_explorer(
+    soh_df: pd.DataFrame,
+    output_dir: str | Path,
+    discharge_df: pd.DataFrame | None = None,
+    levels=DECIMATION_LEVELS,
+) -> Path:
+    """
+    Write the interactive explorer site.
+
+    Parameters
+    ----------
+    soh_df : pd.DataFrame
+        Checkup-level table with `cell_id`, `checkup_num`, `soh` or
+        `soh_percentage` and a capacity column
+    output_dir : str or Path
+        Destination directory
+    discharge_df : pd.DataFrame, optional
+        Raw discharge rows (`time_s`, `current_a`, `voltage_v`, optionally
+        `dQ_ah`) for the per-checkup V-Q curves
+    levels : sequence of int
+        Decimation levels (max buckets per checkup curve), coarse first;
+        the first one is embedded in the page
+
+    Returns
+    -------
+    Path
+        Path of index.html
+    """
+    _require_plotly()
+    import plotly.offline
+
+    output_dir = Path(output_dir)
+    cell_dir = output_dir / "cells"
+    cell_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / "plotly.min.js").write_text(plotly.offline.get_plotlyjs(), encoding="utf-8")
+
+    cells = sorted(soh_df["cell_id"].unique())
+    for cell_id in cells:
+        cell_raw = None
+        if discharge_df is not None:
+            cell_raw = cell_slice(discharge_df, cell_id)
+        fig, scripts = _cell_figure(cell_id, cell_slice(soh_df, cell_id), cell_raw, levels)
+        for name, text in scripts.items():
+            (cell_dir / name).write_text(text, encoding="utf-8")
+        fig.write_html(
+            cell_dir / f"{cell_id}.html",
+            include_plotlyjs="../plotly.min.js",
+            post_script=_LEVEL_LOADER if scripts else None,
+        )
+
+    fleet_html = _fleet_figure(soh_df).to_html(full_html=False, include_plotlyjs="plotly.min.js")
+    links = "\n".join(
+        f'<li><a href="cells/{html.escape(str(c))}.html">{html.escape(str(c))}</a></li>'
+        for c in cells
+    )
+    index_path = output_dir / "index.html"
+    index_path.write_text(
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\">"
+        "<title>Battery SOH Explorer</title></head><body>\n"
+        f"{fleet_html}\n<h2>Cells ({len(cells)})</h2>\n"
+        f"<ul style=\"columns: 6\">\n{links}\n</ul>\n</body></html>\n",
+        encoding="utf-8",
+    )
+    print(f"  Interactive explorer saved: {index_path}")
+    return index_path
@@ -1,11 +1,23 @@
+import numpy as np
 import pandas as pd
 
+# Flat imports when run from src/ (scripts, notebooks), relative when
+# imported as the `src` package
+try:
+    from .preprocessing import attach_group_index, get_group_index
+except ImportError:
+    from preprocessing import attach_group_index, get_group_index
+
 
 def compute_delta_time(df: pd.DataFrame) -> pd.DataFrame:
     """
     Compute time step per cycle.
     """
     df = df.copy()
+    index = get_group_index(df)
+    if index is not None:
+        df["delta_t"] = index.diff(df["time_s"].to_numpy(dtype=float))
+        return df
     df["delta_t"] = (
         df.groupby(["cell_id", "checkup_num"])["time_s"]
         .diff()
@@ -14,12 +26,27 @@ def compute_delta_time(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def integrate_discharge_capacity(df: pd.DataFrame) -> pd.DataFrame:
+def integrate_discharge_capacity(df: pd.DataFrame, method: str = "rectangle") -> pd.DataFrame:
     """
     Integrate discharge current to capacity (Ah).
+
+    `method="trapezoid"` averages the current over each time step instead
+    of using the current at the end of the step.
     """
     df = df.copy()
-    df["dQ_ah"] = df["current_a"].abs() * df["delta_t"] / 3600
+    current = df["current_a"].abs()
+    if method == "trapezoid":
+        index = get_group_index(df)
+        if index is not None:
+            values = current.to_numpy(dtype=float)
+            prev = np.r_[values[:1], values[:-1]]
+            prev[index.starts] = values[index.starts]
+        else:
+            prev = current.groupby([df["cell_id"], df["checkup_num"]]).shift().fillna(current)
+        current = (current + prev) / 2
+    elif method != "rectangle":
+        raise ValueError(f"Unknown integration method: {method}")
+    df["dQ_ah"] = current * df["delta_t"] / 3600
     return df
 
 
@@ -27,6 +54,15 @@ def aggregate_discharge_features(df: pd.DataFrame) -> pd.DataFrame:
     """
     Aggregate discharge features at cycle level.
     """
+    index = get_group_index(df)
+    if index is not None:
+        features = index.keys()
+        features["discharge_capacity_ah"] = index.sum(df["dQ_ah"].to_numpy(dtype=float))
+        features["duration_s"] = index.sum(df["delta_t"].to_numpy(dtype=float))
+        features["mean_current_a"] = index.mean(np.abs(df["current_a"].to_numpy(dtype=float)))
+        features["min_voltage_v"] = index.min(df["voltage_v"].to_numpy(dtype=float))
+        return attach_group_index(features, index.cycle_index())
+
     return (
         df.groupby(["cell_id", "checkup_num"], as_index=False)
         .agg(
@@ -36,3 +72,352 @@ def aggregate_discharge_features(df: pd.DataFrame) -> pd.DataFrame:
             min_voltage_v=("voltage_v", "min"),
         )
     )
+
+
+def merge_signal_features(cycles: pd.DataFrame, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Left-merge per-checkup signal features of the discharge rows `df`
+    (ICA/DVA peaks and resampled-curve features, see
+    `compute_ica_dva_features` and `resampled_curve_features`) into a
+    cycle table on (cell_id, checkup_num).
+    """
+    if len(df) == 0:
+        return cycles
+    index = get_group_index(cycles)
+    for signal in (compute_ica_dva_features(df), resampled_curve_features(df)):
+        cycles = cycles.merge(signal, on=["cell_id", "checkup_num"], how="left")
+    # A left merge keeps row order, so the index still applies
+    if index is not None:
+        attach_group_index(cycles, index)
+    return cycles
+
+
+def build_cycle_features(df: pd.DataFrame, signal_features: bool = True) -> pd.DataFrame:
+    """
+    Cycle-level feature table of discharge rows: the aggregates of
+    `aggregate_discharge_features` plus, with `signal_features`, the
+    signal features of `merge_signal_features`.
+    """
+    features = aggregate_discharge_features(df)
+    if signal_features:
+        features = merge_signal_features(features, df)
+    return features
+
+
+# Default grids for incremental-capacity / differential-voltage analysis
+ICA_VOLTAGE_GRID = np.linspace(2.5, 4.3, 361)
+DVA_CAPACITY_GRID = np.linspace(0.0, 1.0, 201)
+
+
+def _group_bounds(codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Start/stop offsets of each run in a sorted group-code array.
+    """
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    stops = np.r_[starts[1:], len(codes)]
+    return starts, stops
+
+
+def _group_codes(df: pd.DataFrame) -> tuple[np.ndarray, pd.DataFrame]:
+    """
+    Per-row (cell_id, checkup_num) group codes and the sorted group keys.
+    """
+    index = get_group_index(df)
+    if index is not None:
+        return index.codes, index.keys()
+    grouped = df.groupby(["cell_id", "checkup_num"], sort=True)
+    return grouped.ngroup().to_numpy(), grouped.size().index.to_frame(index=False)
+
+
+def _group_argsort(codes: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    Order by (codes, values) via one argsort on a composite float key.
+    """
+    base = values.min()
+    span = values.max() - base + 1.0
+    return np.argsort(codes * span + (values - base), kind="stable")
+
+
+def _batched_interp(x, xp, fp, codes):
+    """
+    Row-wise `np.interp` for many groups in a single call.
+
+    `xp`/`fp` hold all groups concatenated, sorted by (codes, xp). Each
+    group is shifted onto its own disjoint interval so one global
+    interpolation serves every row of `x` (groups x grid points); queries
+    outside a group's range are clamped to its end points.
+    """
+    starts, stops = _group_bounds(codes)
+    lo, hi = xp[starts], xp[stops - 1]
+    base = min(xp.min(), x.min())
+    span = max(xp.max(), x.max()) - base + 1.0
+    offsets = np.arange(len(starts)) * span
+
+    xq = np.clip(x, lo[:, None], hi[:, None]) - base + offsets[:, None]
+    return np.interp(xq.ravel(), xp - base + offsets[codes], fp).reshape(x.shape)
+
+
+def _smooth_rows(y: np.ndarray, window: int) -> np.ndarray:
+    """
+    Centered moving average along axis 1 (edge-padded).
+    """
+    if window <= 1:
+        return y
+    pad = window // 2
+    padded = np.pad(y, ((0, 0), (pad, window - 1 - pad)), mode="edge")
+    csum = np.cumsum(padded, axis=1)
+    csum = np.concatenate([np.zeros((len(y), 1)), csum], axis=1)
+    return (csum[:, window:] - csum[:, :-window]) / window
+
+
+def _top_peaks(y, grid, n_peaks, half_width, min_distance):
+    """
+    Position, height and area of the `n_peaks` highest local maxima per row.
+
+    Peaks are picked greedily, highest first; maxima closer than
+    `min_distance` (grid units) to an already picked peak are suppressed,
+    so noise ripples on a peak's flank are not reported as further peaks.
+    Areas are trapezoidal integrals over grid +/- half_width around each
+    peak. Missing peaks are NaN.
+    """
+    inner = y[:, 1:-1]
+    is_peak = (inner > y[:, :-2]) & (inner >= y[:, 2:])
+    heights = np.where(is_peak, inner, -np.inf)
+    inner_grid = grid[1:-1]
+    rows = np.arange(len(y))
+
+    idx = np.zeros((len(y), n_peaks), dtype=np.int64)
+    valid = np.zeros((len(y), n_peaks), dtype=bool)
+    for i in range(n_peaks):
+        best = np.argmax(heights, axis=1)
+        idx[:, i] = best
+        valid[:, i] = np.isfinite(heights[rows, best])
+        near = np.abs(inner_grid[None, :] - inner_grid[best][:, None]) < min_distance
+        near[rows, best] = True
+        heights = np.where(near, -np.inf, heights)
+    idx = idx + 1
+
+    height = np.take_along_axis(y, idx, axis=1)
+    position = grid[idx]
+
+    steps = (y[:, 1:] + y[:, :-1]) / 2 * np.diff(grid)
+    cum = np.concatenate([np.zeros((len(y), 1)), np.cumsum(steps, axis=1)], axis=1)
+    lo = np.searchsorted(grid, position - half_width)
+    hi = np.clip(np.searchsorted(grid, position + half_width, side="right") - 1, 0, len(grid) - 1)
+    area = np.take_along_axis(cum, hi, axis=1) - np.take_along_axis(cum, lo, axis=1)
+
+    nan = np.full(height.shape, np.nan)
+    return (
+        np.where(valid, position, nan),
+        np.where(valid, height, nan),
+        np.where(valid, area, nan),
+    )
+
+
+def compute_ica_dva_features(
+    df: pd.DataFrame,
+    voltage_grid: np.ndarray = ICA_VOLTAGE_GRID,
+    capacity_grid: np.ndarray = DVA_CAPACITY_GRID,
+    smooth_window: int = 9,
+    n_peaks: int = 2,
+    peak_half_width_v: float = 0.05,
+    min_peak_distance_v: float | None = None,
+    min_peak_distance_q: float = 0.05,
+) -> pd.DataFrame:
+    """
+    Extract incremental-capacity (dQ/dV) and differential-voltage (dV/dQ)
+    peak features for every discharge checkup.
+
+    All checkups are processed as one (checkups x grid) array: Q(V) and
+    V(Q) are interpolated onto fixed grids with a single batched
+    `np.interp`, differentiated and smoothed along the grid axis, and the
+    highest peaks are picked per row.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Discharge rows with `dQ_ah` (see `integrate_discharge_capacity`)
+    voltage_grid : np.ndarray
+        Ascending voltage grid (V) for dQ/dV
+    capacity_grid : np.ndarray
+        Ascending grid of discharged capacity fraction (0-1) for dV/dQ
+    smooth_window : int
+        Moving-average window in grid points
+    n_peaks : int
+        Number of peaks reported per curve, highest first
+    peak_half_width_v : float
+        Half width (V) of the window integrated for ICA peak areas
+    min_peak_distance_v : float, optional
+        Minimum spacing (V) between reported ICA peaks (defaults to
+        `peak_half_width_v`)
+    min_peak_distance_q : float
+        Minimum spacing (capacity fraction) between reported DVA peaks
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (cell_id, checkup_num) with `ica_peak{i}_v`,
+        `ica_peak{i}_height`, `ica_peak{i}_area`, `dva_peak{i}_q` and
+        `dva_peak{i}_height` columns
+    """
+    voltage_grid = np.asarray(voltage_grid, dtype=float)
+    capacity_grid = np.asarray(capacity_grid, dtype=float)
+
+    codes, keys = _group_codes(df)
+    order = _group_argsort(codes, df["time_s"].to_numpy(dtype=float))
+    codes = codes[order]
+    voltage = df["voltage_v"].to_numpy(dtype=float)[order]
+    dq = df["dQ_ah"].to_numpy(dtype=float)[order]
+
+    # Discharged capacity per checkup (cumsum restarted at each group)
+    starts, stops = _group_bounds(codes)
+    csum = np.cumsum(dq)
+    q = csum - (csum[starts] - dq[starts])[codes]
+    q_total = np.maximum(q[stops - 1], 1e-12)
+    n_groups = len(starts)
+
+    # ICA: Q(V) on the voltage grid, -dQ/dV is positive during discharge
+    by_voltage = _group_argsort(codes, voltage)
+    q_on_v = _batched_interp(
+        np.broadcast_to(voltage_grid, (n_groups, len(voltage_grid))),
+        voltage[by_voltage], q[by_voltage], codes[by_voltage],
+    )
+    ica = _smooth_rows(-np.gradient(q_on_v, voltage_grid, axis=1), smooth_window)
+
+    # DVA: V(Q/Q_total) on the capacity grid, -dV/dQ in V/Ah
+    v_on_q = _batched_interp(
+        np.broadcast_to(capacity_grid, (n_groups, len(capacity_grid))),
+        q / q_total[codes], voltage, codes,
+    )
+    dva = _smooth_rows(
+        -np.gradient(v_on_q, capacity_grid, axis=1) / q_total[:, None], smooth_window
+    )
+
+    if min_peak_distance_v is None:
+        min_peak_distance_v = peak_half_width_v
+    ica_pos, ica_height, ica_area = _top_peaks(
+        ica, voltage_grid, n_peaks, peak_half_width_v, min_peak_distance_v
+    )
+    dva_pos, dva_height, _ = _top_peaks(dva, capacity_grid, n_peaks, 0.0, min_peak_distance_q)
+
+    features = keys.reset_index(drop=True)
+    for i in range(n_peaks):
+        features[f"ica_peak{i + 1}_v"] = ica_pos[:, i]
+        features[f"ica_peak{i + 1}_height"] = ica_height[:, i]
+        features[f"ica_peak{i + 1}_area"] = ica_area[:, i]
+    for i in range(n_peaks):
+        features[f"dva_peak{i + 1}_q"] = dva_pos[:, i]
+        features[f"dva_peak{i + 1}_height"] = dva_height[:, i]
+    return features
+
+
+def resample_checkups(
+    df: pd.DataFrame,
+    axis: str = "time",
+    n_points: int = 500,
+    step: float | None = None,
+    columns=("current_a", "voltage_v"),
+) -> dict:
+    """
+    Resample every checkup onto a shared uniform time or capacity grid.
+
+    Discharged capacity is integrated with the trapezoidal rule on the raw
+    samples, then all signals are interpolated for all checkups at once
+    (one batched `np.interp`). Grid points past the end of a checkup are
+    NaN.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Discharge rows with `cell_id`, `checkup_num`, `time_s`, `current_a`
+        and the requested `columns`
+    axis : {"time", "capacity"}
+        Resample against time since checkup start (s) or discharged
+        capacity (Ah)
+    n_points : int
+        Grid size, spanning the longest checkup (ignored if `step` is set)
+    step : float, optional
+        Grid spacing in seconds or Ah
+    columns : sequence of str
+        Signals to resample
+
+    Returns
+    -------
+    dict
+        `keys` (DataFrame of cell_id/checkup_num, one per row), `grid`
+        (1-D float32) and one (checkups x grid) float32 matrix per signal,
+        including `time_s` and `capacity_ah`
+    """
+    if axis not in ("time", "capacity"):
+        raise ValueError(f"Unknown resampling axis: {axis}")
+
+    codes, keys = _group_codes(df)
+    time_s = df["time_s"].to_numpy(dtype=float)
+    order = _group_argsort(codes, time_s)
+    codes = codes[order]
+    starts, stops = _group_bounds(codes)
+
+    time_s = time_s[order]
+    t_rel = time_s - time_s[starts][codes]
+
+    # Trapezoidal capacity, restarted per checkup
+    current = np.abs(df["current_a"].to_numpy(dtype=float)[order])
+    dt = np.diff(t_rel, prepend=0.0)
+    dq = (current + np.r_[current[:1], current[:-1]]) / 2 * dt / 3600
+    dq[starts] = 0.0
+    csum = np.cumsum(dq)
+    capacity = csum - csum[starts][codes]
+
+    signals = {"time_s": t_rel, "capacity_ah": capacity}
+    for col in columns:
+        signals[col] = df[col].to_numpy(dtype=float)[order]
+
+    x = t_rel if axis == "time" else capacity
+    extent = x[stops - 1]
+    if step is not None:
+        grid = np.arange(0.0, extent.max() + step, step)
+    else:
+        grid = np.linspace(0.0, extent.max(), n_points)
+
+    queries = np.broadcast_to(grid, (len(starts), len(grid)))
+    outside = grid[None, :] > extent[:, None]
+
+    result = {"keys": keys, "grid": grid.astype(np.float32)}
+    for name, values in signals.items():
+        matrix = _batched_interp(queries, x, values, codes).astype(np.float32)
+        matrix[outside] = np.nan
+        result[name] = matrix
+    return result
+
+
+def resampled_curve_features(df: pd.DataFrame, n_points: int = 200) -> pd.DataFrame:
+    """
+    Sampling-independent mean voltages of every checkup.
+
+    The raw time stamps are irregular, so plain row means over-weight
+    densely sampled stretches. Here the voltage is averaged on the
+    uniform grids of `resample_checkups` instead.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Discharge rows with `cell_id`, `checkup_num`, `time_s`,
+        `current_a` and `voltage_v`
+    n_points : int
+        Grid size of the resampling
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (cell_id, checkup_num) with `mean_voltage_time_v`
+        (time-weighted) and `mean_voltage_capacity_v` (weighted by
+        discharged capacity, i.e. energy / capacity)
+    """
+    features = None
+    for axis, column in (("time", "mean_voltage_time_v"), ("capacity", "mean_voltage_capacity_v")):
+        resampled = resample_checkups(df, axis=axis, n_points=n_points, columns=("voltage_v",))
+        if features is None:
+            features = resampled["keys"].reset_index(drop=True)
+        # Grid points past the end of a checkup are NaN
+        features[column] = np.nanmean(resampled["voltage_v"], axis=1, dtype=np.float64)
+    return features
@@ -0,0 +1,231 @@
+"""
+Versioned float32 feature-matrix store shared by training and inference.
+
+A store is a directory holding:
+- matrix.npy  : contiguous float32 (rows x features), memory-mappable
+- target.npy  : optional float32 target vector
+- rows.npy    : (cell_id, checkup_num) of every row
+- schema.json : format version, column order, dtype, shape, target name
+
+Loading checks the schema against the columns the caller expects, so a
+model is never scored on mis-ordered or missing features.
+"""
+from contextlib import contextmanager
+from pathlib import Path
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+FORMAT_VERSION = 1
+MATRIX_DTYPE = np.float32
+
+
+def schema_id(columns) -> str:
+    """
+    Short fingerprint of an ordered list of feature columns.
+    """
+    return hashlib.sha1("\x1f".join(columns).encode()).hexdigest()[:12]
+
+
+def normalize_merge_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Undo pandas merge suffixes: keep `col_x` as `col`, drop `col_y`.
+    """
+    renames = {
+        col: col[:-2] for col in df.columns
+        if col.endswith("_x") and col[:-2] not in df.columns
+    }
+    df = df.rename(columns=renames)
+    drop = [
+        col for col in df.columns
+        if col.endswith("_y") and col[:-2] in renames.values()
+    ]
+    return df.drop(columns=drop)
+
+
+class FeatureMatrix:
+    """
+    Feature matrix with its column schema and (cell_id, checkup_num) rows.
+    """
+
+    def __init__(self, X, columns, rows: pd.DataFrame, y=None, target=None):
+        self.X = X
+        self.columns = list(columns)
+        self.rows = rows
+        self.y = y
+        self.target = target
+        if X.shape != (len(rows), len(self.columns)):
+            raise ValueError(
+                f"Matrix shape {X.shape} does not match "
+                f"{len(rows)} rows x {len(self.columns)} columns"
+            )
+
+    @property
+    def schema_id(self) -> str:
+        return schema_id(self.columns)
+
+    def check_schema(self, expected_columns) -> None:
+        """
+        Raise if the stored column order differs from `expected_columns`.
+        """
+        expected = list(expected_columns)
+        if expected != self.columns:
+            missing = [c for c in expected if c not in self.columns]
+            extra = [c for c in self.columns if c not in expected]
+            raise ValueError(
+                "Feature schema mismatch: "
+                f"expected {expected}, stored {self.columns} "
+                f"(missing={missing}, extra={extra})"
+            )
+
+    def to_frame(self) -> pd.DataFrame:
+        features = pd.DataFrame(self.X, columns=self.columns)
+        df = pd.concat(
+            [
+                self.rows.reset_index(drop=True),
+                features.drop(columns=[c for c in self.columns if c in self.rows]),
+            ],
+            axis=1,
+        )
+        if self.y is not None:
+            df[self.target] = self.y
+        return df
+
+
+def build_feature_matrix(
+    df: pd.DataFrame, feature_cols, target_col: str | None = "soh"
+) -> FeatureMatrix:
+    """
+    Build a FeatureMatrix from a feature table (merge suffixes are fixed).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Feature table with `cell_id`, `checkup_num` and `feature_cols`
+    feature_cols : list of str
+        Feature columns, in model order
+    target_col : str or None
+        Target column to store alongside the matrix
+
+    Returns
+    -------
+    FeatureMatrix
+    """
+    df = normalize_merge_columns(df)
+    missing = set(feature_cols) - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing feature columns: {missing}")
+
+    X = np.ascontiguousarray(df[list(feature_cols)].to_numpy(dtype=MATRIX_DTYPE))
+    y = None
+    if target_col is not None:
+        y = np.ascontiguousarray(df[target_col].to_numpy(dtype=MATRIX_DTYPE))
+    rows = df[["cell_id", "checkup_num"]].reset_index(drop=True)
+    return FeatureMatrix(X, feature_cols, rows, y, target_col)
+
+
+def save_feature_matrix(fm: FeatureMatrix, path: str | Path) -> Path:
+    """
+    Write a FeatureMatrix store directory (replaced atomically).
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    np.save(tmp / "matrix.npy", np.ascontiguousarray(fm.X, dtype=MATRIX_DTYPE))
+    if fm.y is not None:
+        np.save(tmp / "target.npy", np.ascontiguousarray(fm.y, dtype=MATRIX_DTYPE))
+    rows = np.rec.fromarrays(
+        [np.asarray(fm.rows["cell_id"], dtype=str), fm.rows["checkup_num"].to_numpy(dtype=np.int64)],
+        names=["cell_id", "checkup_num"],
+    )
+    np.save(tmp / "rows.npy", rows)
+
+    schema = {
+        "format_version": FORMAT_VERSION,
+        "dtype": np.dtype(MATRIX_DTYPE).name,
+        "shape": list(fm.X.shape),
+        "columns": fm.columns,
+        "schema_id": fm.schema_id,
+        "target": fm.target if fm.y is not None else None,
+    }
+    (tmp / "schema.json").write_text(json.dumps(schema, indent=2))
+
+    if path.exists():
+        old = path.with_name(path.name + ".old")
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old)
+    else:
+        os.replace(tmp, path)
+    return path
+
+
+def load_feature_matrix(
+    path: str | Path, expected_columns=None, mmap: bool = True
+) -> FeatureMatrix:
+    """
+    Load a FeatureMatrix store, memory-mapped read-only by default.
+
+    Parameters
+    ----------
+    path : str or Path
+        Store directory
+    expected_columns : list of str, optional
+        Column order the caller (e.g. a trained model) requires;
+        a mismatch raises ValueError
+    mmap : bool
+        Memory-map the matrix instead of reading it into RAM
+
+    Returns
+    -------
+    FeatureMatrix
+    """
+    path = Path(path)
+    schema = json.loads((path / "schema.json").read_text())
+    if schema.get("format_version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported feature store version {schema.get('format_version')} "
+            f"(expected {FORMAT_VERSION})"
+        )
+
+    mmap_mode = "r" if mmap else None
+    X = np.load(path / "matrix.npy", mmap_mode=mmap_mode)
+    if X.dtype != np.dtype(schema["dtype"]) or list(X.shape) != schema["shape"]:
+        raise ValueError(
+            f"Stored matrix {X.dtype} {X.shape} does not match schema "
+            f"{schema['dtype']} {tuple(schema['shape'])}"
+        )
+
+    rows = np.load(path / "rows.npy")
+    rows = pd.DataFrame({"cell_id": rows["cell_id"], "checkup_num": rows["checkup_num"]})
+    y = None
+    if schema["target"] is not None:
+        y = np.load(path / "target.npy", mmap_mode=mmap_mode)
+
+    fm = FeatureMatrix(X, schema["columns"], rows, y, schema["target"])
+    if expected_columns is not None:
+        fm.check_schema(expected_columns)
+    return fm
+
+
+@contextmanager
+def temporary_feature_store(fm: FeatureMatrix):
+    """
+    Save `fm` to a temporary store for the duration of the block.
+
+    Yields the store path; worker processes load it with
+    `load_feature_matrix` and share the memory-mapped pages.
+    """
+    tmp_dir = tempfile.mkdtemp(prefix="soh_features_")
+    try:
+        yield save_feature_matrix(fm, os.path.join(tmp_dir, "features"))
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
@@ -0,0 +1,190 @@
+"""
+Batched SOH trajectory and End-of-Life (EOL) forecasting for a fleet.
+
+Every cell gets the linear SOH ~ checkup_num trend used in the
+degradation-rate analysis, but all cells are fitted and forecast together
+from grouped sums, so there is no per-cell model call.
+"""
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+def fit_degradation_trends(
+    soh_df: pd.DataFrame, soh_col: str = "soh"
+) -> pd.DataFrame:
+    """
+    Fit a linear SOH trend per cell in one pass over the fleet.
+
+    Parameters
+    ----------
+    soh_df : pd.DataFrame
+        History with `cell_id`, `checkup_num` and `soh_col`
+    soh_col : str
+        SOH column to model
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per cell: slope, intercept, residual std and the
+        statistics needed for prediction intervals
+    """
+    codes, cells = pd.factorize(soh_df["cell_id"], sort=True)
+    x = soh_df["checkup_num"].to_numpy(dtype=float)
+    y = soh_df[soh_col].to_numpy(dtype=float)
+    n_cells = len(cells)
+
+    n = np.bincount(codes, minlength=n_cells).astype(float)
+    x_mean = np.bincount(codes, x, n_cells) / n
+    y_mean = np.bincount(codes, y, n_cells) / n
+    dx = x - x_mean[codes]
+    sxx = np.bincount(codes, dx * dx, n_cells)
+    sxy = np.bincount(codes, dx * (y - y_mean[codes]), n_cells)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(sxx > 0, sxy / sxx, np.nan)
+        intercept = y_mean - slope * x_mean
+        resid = y - (intercept[codes] + slope[codes] * x)
+        sse = np.bincount(codes, resid * resid, n_cells)
+        sigma = np.where(n > 2, np.sqrt(sse / (n - 2)), np.nan)
+
+    last = np.full(n_cells, -np.inf)
+    np.maximum.at(last, codes, x)
+    # Keep integer checkup numbers integer, so forecasts merge cleanly
+    checkup_dtype = soh_df["checkup_num"].dtype
+    if pd.api.types.is_integer_dtype(checkup_dtype):
+        last = last.astype(getattr(checkup_dtype, "numpy_dtype", checkup_dtype))
+
+    return pd.DataFrame({
+        "cell_id": cells,
+        "n_checkups": n.astype(int),
+        "last_checkup": last,
+        "slope": slope,
+        "intercept": intercept,
+        "sigma": sigma,
+        "x_mean": x_mean,
+        "sxx": sxx,
+    })
+
+
+def _t_quantile(n_checkups: np.ndarray, confidence: float) -> np.ndarray:
+    """
+    Two-sided Student t quantile with n - 2 degrees of freedom per cell
+    (NaN where the residual spread is undefined).
+    """
+    dof = np.asarray(n_checkups, dtype=float) - 2
+    q = stats.t.ppf(0.5 + confidence / 2, np.maximum(dof, 1))
+    return np.where(dof > 0, q, np.nan)
+
+
+def forecast_soh(
+    trends: pd.DataFrame, horizon: int = 5, confidence: float = 0.95
+) -> pd.DataFrame:
+    """
+    Predict SOH for the next `horizon` checkups of every cell.
+
+    Parameters
+    ----------
+    trends : pd.DataFrame
+        Output of `fit_degradation_trends`
+    horizon : int
+        Number of future checkups
+    confidence : float
+        Coverage of the prediction interval (Student t, n - 2 dof)
+
+    Returns
+    -------
+    pd.DataFrame
+        Long format: cell_id, checkup_num, soh_pred, soh_lower, soh_upper
+    """
+    last = trends["last_checkup"].to_numpy()
+    steps = (last[:, None] + np.arange(1, horizon + 1)).astype(last.dtype)
+    slope = trends["slope"].to_numpy()[:, None]
+    intercept = trends["intercept"].to_numpy()[:, None]
+    n = trends["n_checkups"].to_numpy()[:, None]
+    t = _t_quantile(n, confidence)
+
+    pred = intercept + slope * steps
+    with np.errstate(divide="ignore", invalid="ignore"):
+        se = trends["sigma"].to_numpy()[:, None] * np.sqrt(
+            1 + 1 / n
+            + (steps - trends["x_mean"].to_numpy()[:, None]) ** 2
+            / trends["sxx"].to_numpy()[:, None]
+        )
+
+    return pd.DataFrame({
+        "cell_id": np.repeat(trends["cell_id"].to_numpy(), horizon),
+        "checkup_num": steps.ravel(),
+        "soh_pred": pred.ravel(),
+        "soh_lower": (pred - t * se).ravel(),
+        "soh_upper": (pred + t * se).ravel(),
+    })
+
+
+def forecast_eol(
+    trends: pd.DataFrame, threshold: float = 0.8, confidence: float = 0.95
+) -> pd.DataFrame:
+    """
+    Project the checkup at which each cell's SOH trend reaches `threshold`.
+
+    The interval comes from the slope's confidence band pivoted around the
+    mean of the observed history. Cells whose trend (or band edge) does
+    not degrade get an infinite EOL; where the slope (one checkup) or its
+    spread (two checkups) is undefined the EOL or interval is NaN.
+
+    Parameters
+    ----------
+    trends : pd.DataFrame
+        Output of `fit_degradation_trends`
+    threshold : float
+        EOL SOH level, in the same units as the fitted SOH column
+    confidence : float
+        Coverage of the slope band (Student t, n - 2 dof)
+
+    Returns
+    -------
+    pd.DataFrame
+        cell_id, eol_checkup, eol_lower, eol_upper, checkups_to_eol
+    """
+    slope = trends["slope"].to_numpy()
+    x_mean = trends["x_mean"].to_numpy()
+    y_mean = trends["intercept"].to_numpy() + slope * x_mean
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope_se = trends["sigma"].to_numpy() / np.sqrt(trends["sxx"].to_numpy())
+    t = _t_quantile(trends["n_checkups"].to_numpy(), confidence)
+
+    def crossing(b):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            eol = np.where(b < 0, x_mean + (threshold - y_mean) / b, np.inf)
+        return np.where(np.isnan(b), np.nan, eol)
+
+    eol = crossing(slope)
+    return pd.DataFrame({
+        "cell_id": trends["cell_id"].to_numpy(),
+        "eol_checkup": eol,
+        "eol_lower": crossing(slope - t * slope_se),
+        "eol_upper": crossing(slope + t * slope_se),
+        "checkups_to_eol": eol - trends["last_checkup"].to_numpy(),
+    })
+
+
+def forecast_fleet(
+    soh_df: pd.DataFrame,
+    horizon: int = 5,
+    threshold: float = 0.8,
+    soh_col: str = "soh",
+    confidence: float = 0.95,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Fit, forecast and project EOL for all cells in one batch.
+
+    Returns
+    -------
+    tuple of (trajectory_df, eol_df)
+        See `forecast_soh` and `forecast_eol`
+    """
+    trends = fit_degradation_trends(soh_df, soh_col=soh_col)
+    return (
+        forecast_soh(trends, horizon, confidence),
+        forecast_eol(trends, threshold, confidence),
+    )
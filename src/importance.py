@@ -0,0 +1,190 @@
+"""
+Permutation importance and drop-column ablation for SOH models.
+
+Work is fanned out over a process pool. The feature matrix is written
+once to a temporary feature store (see feature_store.py) and every worker
+memory-maps it read-only, so the data is shared through the page cache
+instead of being pickled per task. Baseline predictions and scores are
+computed once and reused by all tasks.
+
+A feature whose removal barely matters but whose permutation destroys the
+score (e.g. `discharge_capacity_ah`, which is SOH's numerator) is a
+leakage suspect.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+
+from evaluation import evaluate_regression
+from feature_store import load_feature_matrix, temporary_feature_store
+
+HIGHER_IS_BETTER = {"R2"}
+
+# Per-process state set by _init_worker
+_worker = {}
+
+
+def _init_worker(store_path, eval_store_path, model, train_fn):
+    _worker["train"] = load_feature_matrix(store_path)
+    _worker["eval"] = load_feature_matrix(eval_store_path) if eval_store_path else _worker["train"]
+    _worker["model"] = model
+    _worker["train_fn"] = train_fn
+
+
+def _loss(y_true, y_pred, metric) -> float:
+    """
+    Metric oriented so that larger means worse.
+    """
+    value = evaluate_regression(y_true, y_pred)[metric]
+    return -value if metric in HIGHER_IS_BETTER else value
+
+
+def _permutation_task(task):
+    col, seed, metric = task
+    fm = _worker["eval"]
+    X = np.array(fm.X)
+    X[:, col] = np.random.default_rng(seed).permutation(X[:, col])
+    return _loss(fm.y, _worker["model"].predict(X), metric)
+
+
+def _drop_column_task(task):
+    col, metric = task
+    train, evaluate = _worker["train"], _worker["eval"]
+    keep = [j for j in range(train.X.shape[1]) if j != col]
+    model = _worker["train_fn"](train.X[:, keep], train.y)
+    return _loss(evaluate.y, model.predict(evaluate.X[:, keep]), metric)
+
+
+def permutation_importance(
+    model,
+    fm,
+    metric: str = "RMSE",
+    n_repeats: int = 10,
+    max_workers: int | None = None,
+    random_state: int = 42,
+) -> pd.DataFrame:
+    """
+    Increase in loss when each feature column is randomly permuted.
+
+    Parameters
+    ----------
+    model : fitted estimator
+        Any trained `modeling` model
+    fm : FeatureMatrix
+        Evaluation features and target
+    metric : {"MAE", "RMSE", "R2"}
+        Metric from `evaluation.evaluate_regression`
+    n_repeats : int
+        Permutations per feature
+    max_workers : int, optional
+        Worker processes (defaults to the CPU count)
+    random_state : int
+
+    Returns
+    -------
+    pd.DataFrame
+        feature, importance_mean, importance_std, baseline_loss
+    """
+    baseline = _loss(fm.y, model.predict(fm.X), metric)
+    n_features = len(fm.columns)
+    tasks = [
+        (col, [random_state, col, rep], metric)
+        for col in range(n_features)
+        for rep in range(n_repeats)
+    ]
+
+    with temporary_feature_store(fm) as store:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(store, None, model, None),
+        ) as pool:
+            losses = list(pool.map(_permutation_task, tasks, chunksize=max(1, n_repeats // 2)))
+
+    increase = np.asarray(losses).reshape(n_features, n_repeats) - baseline
+    return pd.DataFrame({
+        "feature": fm.columns,
+        "importance_mean": increase.mean(axis=1),
+        "importance_std": increase.std(axis=1),
+        "baseline_loss": baseline,
+    }).sort_values("importance_mean", ascending=False, ignore_index=True)
+
+
+def drop_column_importance(
+    train_fn,
+    fm,
+    eval_fm=None,
+    metric: str = "RMSE",
+    max_workers: int | None = None,
+) -> pd.DataFrame:
+    """
+    Increase in loss when a model is retrained without each feature.
+
+    Parameters
+    ----------
+    train_fn : callable
+        A `modeling.train_*` function
+    fm : FeatureMatrix
+        Training features and target
+    eval_fm : FeatureMatrix, optional
+        Held-out evaluation data (defaults to `fm`, i.e. in-sample)
+    metric : {"MAE", "RMSE", "R2"}
+    max_workers : int, optional
+
+    Returns
+    -------
+    pd.DataFrame
+        feature, importance, baseline_loss
+    """
+    evaluate = eval_fm if eval_fm is not None else fm
+    if eval_fm is not None:
+        eval_fm.check_schema(fm.columns)
+    baseline_model = train_fn(fm.X, fm.y)
+    baseline = _loss(evaluate.y, baseline_model.predict(evaluate.X), metric)
+
+    with temporary_feature_store(fm) as store:
+        eval_context = temporary_feature_store(eval_fm) if eval_fm is not None else nullcontext()
+        with eval_context as eval_store:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=_init_worker,
+                initargs=(store, eval_store, None, train_fn),
+            ) as pool:
+                losses = list(pool.map(
+                    _drop_column_task,
+                    [(col, metric) for col in range(len(fm.columns))],
+                ))
+
+    return pd.DataFrame({
+        "feature": fm.columns,
+        "importance": np.asarray(losses) - baseline,
+        "baseline_loss": baseline,
+    }).sort_values("importance", ascending=False, ignore_index=True)
+
+
+def feature_ablation_report(
+    model,
+    train_fn,
+    fm,
+    eval_fm=None,
+    metric: str = "RMSE",
+    n_repeats: int = 10,
+    max_workers: int | None = None,
+) -> pd.DataFrame:
+    """
+    Permutation importance and drop-column importance side by side.
+    """
+    perm = permutation_importance(
+        model, eval_fm if eval_fm is not None else fm,
+        metric=metric, n_repeats=n_repeats, max_workers=max_workers,
+    )
+    drop = drop_column_importance(
+        train_fn, fm, eval_fm=eval_fm, metric=metric, max_workers=max_workers
+    )
+    return (
+        perm[["feature", "importance_mean", "importance_std"]]
+        .rename(columns={"importance_mean": "permutation_mean", "importance_std": "permutation_std"})
+        .merge(drop[["feature", "importance"]].rename(columns={"importance": "drop_column"}), on="feature")
+    )
@@ -0,0 +1,286 @@
+"""
+Asyncio ingest daemon for continuously arriving checkup files.
+
+Watches a Capacity_raw-style directory by polling, waits until a new file
+has stopped changing, featurizes it in a process pool without blocking the
+event loop, updates the SOH table for the affected cells and writes the
+result to the feature store CSV.
+
+Usage:
+    python ingest.py ../data/raw/cell_checkup/Capacity_raw \\
+        ../data/features/battery_features_soh_stream.csv
+"""
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+
+from io_utils import atomic_append_csv, atomic_write_csv, load_csv, parse_checkup_filename
+from pipeline import featurize_checkup_file
+from soh import compute_bol_capacity, compute_soh, compute_soh_delta, flag_eol
+
+KEYS = ["cell_id", "checkup_num"]
+CYCLE_COLUMNS = KEYS + [
+    "discharge_capacity_ah", "duration_s", "mean_current_a", "min_voltage_v"
+]
+SOH_COLUMNS = ["bol_capacity_ah", "soh", "soh_delta", "below_eol"]
+# Columns and dtypes of an empty feature store (cycle aggregates + SOH
+# columns; signal feature columns arrive with the first checkups)
+STORE_DTYPES = {
+    "cell_id": str,
+    "checkup_num": "int64",
+    "discharge_capacity_ah": "float64",
+    "duration_s": "float64",
+    "mean_current_a": "float64",
+    "min_voltage_v": "float64",
+    "bol_capacity_ah": "float64",
+    "soh": "float64",
+    "soh_delta": "float64",
+    "below_eol": bool,
+}
+
+
+def _same_values(stored: pd.DataFrame, recomputed: pd.DataFrame) -> bool:
+    """
+    Check that recomputing did not change any stored row (same keys in
+    both, floats compared to round-off).
+    """
+    recomputed = recomputed.set_index(KEYS).loc[pd.MultiIndex.from_frame(stored[KEYS])]
+    for col in stored.columns.difference(KEYS):
+        old, new = stored[col].to_numpy(), recomputed[col].to_numpy()
+        if old.dtype.kind == "f" or new.dtype.kind == "f":
+            same = np.allclose(old.astype(float), new.astype(float), rtol=1e-12, atol=0, equal_nan=True)
+        else:
+            same = np.array_equal(old, new)
+        if not same:
+            return False
+    return True
+
+
+class CheckupWatcher:
+    """
+    Incrementally maintain the SOH feature store from a watched directory.
+
+    Parameters
+    ----------
+    watch_dir : str or Path
+        Directory receiving checkup CSV files
+    store_path : str or Path
+        Feature store CSV (created if missing, reloaded on restart)
+    pattern : str
+        Glob pattern of checkup files
+    poll_interval : float
+        Seconds between directory scans
+    settle_time : float
+        Seconds a file's size and mtime must stay unchanged before it is
+        treated as completely written
+    max_workers : int, optional
+        Featurization worker processes
+    on_update : callable, optional
+        Called with the updated SOH rows after every batch
+    """
+
+    def __init__(
+        self,
+        watch_dir,
+        store_path,
+        pattern: str = "*.csv",
+        poll_interval: float = 1.0,
+        settle_time: float = 2.0,
+        max_workers: int | None = None,
+        on_update=None,
+    ):
+        self.watch_dir = Path(watch_dir)
+        self.store_path = Path(store_path)
+        self.pattern = pattern
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.max_workers = max_workers
+        self.on_update = on_update
+
+        self._pending = {}   # path -> (signature, first time seen unchanged)
+        self._done = {}      # path -> signature when processed
+        self._pool = None
+        self._stop = None
+
+        if self.store_path.exists():
+            self.soh_df = load_csv(self.store_path)
+        else:
+            self.soh_df = pd.DataFrame({
+                col: pd.Series(dtype=dtype) for col, dtype in STORE_DTYPES.items()
+            })
+        self._stored_keys = set(zip(self.soh_df["cell_id"], self.soh_df["checkup_num"]))
+
+    # ---- event loop side ----
+
+    async def run(self) -> None:
+        """
+        Poll until `stop()` is called.
+        """
+        self._stop = asyncio.Event()
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            self._pool = pool
+            while not self._stop.is_set():
+                await self.poll_once()
+                try:
+                    await asyncio.wait_for(self._stop.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+        self._pool = None
+
+    def stop(self) -> None:
+        if self._stop is not None:
+            self._stop.set()
+
+    async def poll_once(self) -> pd.DataFrame | None:
+        """
+        Process every file that has settled since the last scan.
+
+        Returns
+        -------
+        pd.DataFrame or None
+            Updated SOH rows, or None if nothing new was ingested
+        """
+        loop = asyncio.get_running_loop()
+        ready = await asyncio.to_thread(self._scan)
+        if not ready:
+            return None
+
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self._pool, featurize_checkup_file, path)
+              for path, _ in ready),
+            return_exceptions=True,
+        )
+
+        new_cycles = []
+        for (path, signature), result in zip(ready, results):
+            self._done[path] = signature
+            if isinstance(result, Exception):
+                print(f"  ✗ Error processing {path.name}: {result}")
+                continue
+            print(f"  ✓ Ingested {path.name} ({len(result)} checkup)")
+            new_cycles.append(result)
+
+        if not new_cycles:
+            return None
+        updated = await asyncio.to_thread(self._update, pd.concat(new_cycles))
+        if self.on_update is not None:
+            self.on_update(updated)
+        return updated
+
+    # ---- worker thread side ----
+
+    def _scan(self) -> list:
+        """
+        Files whose size and mtime have been stable for `settle_time`.
+        """
+        now = time.monotonic()
+        ready = []
+        for path in sorted(self.watch_dir.glob(self.pattern)):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if self._done.get(path) == signature:
+                continue
+
+            # Skip files already in the store when restarting
+            if path not in self._done and path not in self._pending:
+                try:
+                    if parse_checkup_filename(path) in self._stored_keys:
+                        self._done[path] = signature
+                        continue
+                except ValueError:
+                    pass
+
+            seen = self._pending.get(path)
+            if seen is None or seen[0] != signature:
+                self._pending[path] = (signature, now)
+            elif now - seen[1] >= self.settle_time and stat.st_size > 0:
+                del self._pending[path]
+                ready.append((path, signature))
+        return ready
+
+    def _update(self, new_cycles: pd.DataFrame) -> pd.DataFrame:
+        """
+        Merge new checkups and recompute SOH for the affected cells only.
+        """
+        new_keys = set(zip(new_cycles["cell_id"], new_cycles["checkup_num"]))
+        affected = set(new_cycles["cell_id"])
+
+        old = self.soh_df
+        in_affected = old["cell_id"].isin(affected)
+        old_cells = old[in_affected]
+        replaced = np.array([
+            key in new_keys
+            for key in zip(old_cells["cell_id"], old_cells["checkup_num"])
+        ], dtype=bool)
+
+        cycles = (
+            pd.concat([old_cells[~replaced].drop(columns=SOH_COLUMNS), new_cycles])
+            .sort_values(KEYS)
+            .reset_index(drop=True)
+        )
+        bol = compute_bol_capacity(cycles)
+        updated = flag_eol(compute_soh_delta(compute_soh(cycles, bol)))
+
+        # Appending is enough only if the new checkups all come after each
+        # cell's last stored one (a re-written or out-of-order file would
+        # leave the store unsorted) and no stored row changed (a new BOL,
+        # or a soh_delta now taken against an inserted checkup)
+        rewrite = list(old.columns) != list(updated.columns)
+        if not rewrite and len(old_cells):
+            last_stored = old_cells.groupby("cell_id")["checkup_num"].max()
+            first_new = new_cycles.groupby("cell_id")["checkup_num"].min()
+            rewrite = bool((first_new.reindex(last_stored.index) <= last_stored).any())
+        if not rewrite and len(old_cells):
+            rewrite = not _same_values(old_cells, updated)
+
+        self.soh_df = (
+            pd.concat([old[~in_affected], updated])
+            .reindex(columns=updated.columns)
+            .sort_values(KEYS)
+            .reset_index(drop=True)
+        )
+        self._stored_keys |= new_keys
+
+        if rewrite or not self.store_path.exists():
+            atomic_write_csv(self.soh_df, self.store_path)
+        else:
+            is_new = [key in new_keys for key in zip(updated["cell_id"], updated["checkup_num"])]
+            atomic_append_csv(updated[is_new], self.store_path)
+        return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch a checkup directory and update SOH features")
+    parser.add_argument("watch_dir")
+    parser.add_argument("store_path")
+    parser.add_argument("--pattern", default="*.csv")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--settle-time", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    watcher = CheckupWatcher(
+        args.watch_dir,
+        args.store_path,
+        pattern=args.pattern,
+        poll_interval=args.poll_interval,
+        settle_time=args.settle_time,
+        max_workers=args.workers,
+    )
+    print(f"Watching {args.watch_dir} -> {args.store_path}")
+    try:
+        asyncio.run(watcher.run())
+    except KeyboardInterrupt:
+        print("Stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 from pathlib import Path
+import os
+import shutil
+
 import pandas as pd
 
 
@@ -30,3 +33,120 @@ def save_csv(df: pd.DataFrame, path: str | Path) -> None:
     path = Path(path)
     path.parent.mkdir(parents=True, exist_ok=True)
     df.to_csv(path, index=False)
+
+
+def atomic_write_csv(df: pd.DataFrame, path: str | Path) -> None:
+    """
+    Write a CSV so that `path` is either absent or complete.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", newline="") as f:
+        df.to_csv(f, index=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def atomic_append_csv(df: pd.DataFrame, path: str | Path) -> None:
+    """
+    Append rows (no header) to an existing CSV through a temporary copy,
+    so `path` is always either the old or the new complete file.
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    shutil.copyfile(path, tmp)
+    with open(tmp, "a", newline="") as f:
+        df.to_csv(f, header=False, index=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def atomic_write_text(text: str, path: str | Path) -> None:
+    """
+    Write a text file so that `path` is either absent or complete.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# Raw SiCWell checkup columns -> standardized names (Notebook 1, Section 4)
+RAW_COLUMN_MAP = {
+    "Time [s]": "time_s",
+    "Current [A]": "current_a",
+    "Cell Voltage [V]": "voltage_v",
+    "Cell Temperature [°C]": "temp_cell_c",
+    "Temperature at Cell Connector [°C]": "temp_connector_c",
+}
+
+
+def parse_checkup_filename(path: str | Path) -> tuple[str, int]:
+    """
+    Extract cell id and checkup number from a raw checkup file name.
+
+    Expected format: AC01_CheckUp01_YYYYMMDD_xxx.csv
+
+    Parameters
+    ----------
+    path : str or Path
+
+    Returns
+    -------
+    tuple of (cell_id, checkup_num)
+    """
+    parts = Path(path).stem.split("_")
+    if len(parts) < 3 or not parts[1].lower().startswith("checkup"):
+        raise ValueError(f"Unexpected checkup file name: {Path(path).name}")
+    return parts[0], int(parts[1][len("checkup"):])
+
+
+def standardize_checkup_frame(df: pd.DataFrame, path: str | Path) -> pd.DataFrame:
+    """
+    Standardize the columns of (a chunk of) a checkup file.
+
+    Raw columns are renamed and `cell_id` / `checkup_num` are taken from
+    the file name when the frame does not carry them.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Rows read from `path`
+    path : str or Path
+        Source file, for the cell id and checkup number
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    df = df.rename(columns={
+        col: RAW_COLUMN_MAP.get(col, col.lower().replace(" ", "_"))
+        for col in df.columns
+    })
+    if "cell_id" not in df.columns or "checkup_num" not in df.columns:
+        cell_id, checkup_num = parse_checkup_filename(path)
+        df["cell_id"] = cell_id
+        df["checkup_num"] = checkup_num
+    return df
+
+
+def load_checkup_file(path: str | Path) -> pd.DataFrame:
+    """
+    Load a single checkup CSV with standardized column names.
+
+    Raw files get their columns renamed and `cell_id` / `checkup_num`
+    taken from the file name; already processed files pass through.
+
+    Parameters
+    ----------
+    path : str or Path
+
+    Returns
+    -------
+    pd.DataFrame
+    """
+    return standardize_checkup_frame(load_csv(path), path)
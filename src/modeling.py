@@ -1,11 +1,20 @@
+import numpy as np
 from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor
 from xgboost import XGBRegressor
 
 
+def _linear_stats(X, y) -> dict:
+    Xa = np.column_stack([np.asarray(X, dtype=float), np.ones(len(X))])
+    y = np.asarray(y, dtype=float)
+    return {"xtx": Xa.T @ Xa, "xty": Xa.T @ y, "n": len(y)}
+
+
 def train_linear_regression(X, y):
     model = LinearRegression()
     model.fit(X, y)
+    # Running sufficient statistics for update_linear_regression
+    model.sufficient_stats_ = _linear_stats(X, y)
     return model
 
 
@@ -30,3 +39,94 @@ def train_xgboost(X, y, random_state=42):
     )
     model.fit(X, y)
     return model
+
+
+# ============================================================================
+# INCREMENTAL UPDATES (new checkup batches)
+# ============================================================================
+
+def update_linear_regression(model, X_new, y_new):
+    """
+    Update a linear model in place with a new batch via its running
+    X'X / X'y.
+
+    Cost depends only on the new rows; the solution equals a full refit
+    on all rows seen so far.
+    """
+    stats = model.sufficient_stats_
+    new = _linear_stats(X_new, y_new)
+    stats = {key: stats[key] + new[key] for key in stats}
+
+    beta = np.linalg.lstsq(stats["xtx"], stats["xty"], rcond=None)[0]
+    model.coef_ = beta[:-1]
+    model.intercept_ = beta[-1]
+    model.sufficient_stats_ = stats
+    return model
+
+
+def update_random_forest(model, X_new, y_new, n_new_trees=50, max_estimators=None):
+    """
+    Grow the forest in place with `n_new_trees` trees fitted on the new
+    batch.
+
+    Existing trees are kept (warm_start). With `max_estimators`, the
+    oldest trees are dropped so the forest tracks recent degradation.
+    """
+    model.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_new_trees)
+    model.fit(X_new, y_new)
+
+    if max_estimators is not None and len(model.estimators_) > max_estimators:
+        model.estimators_ = model.estimators_[-max_estimators:]
+        model.n_estimators = max_estimators
+    return model
+
+
+def update_xgboost(model, X_new, y_new, n_new_rounds=50):
+    """
+    Continue boosting in place from the current booster with
+    `n_new_rounds` rounds fitted on the new batch (xgb_model=
+    continuation).
+    """
+    booster = model.get_booster()
+    n_rounds = booster.num_boosted_rounds()
+    model.set_params(n_estimators=n_new_rounds)
+    model.fit(X_new, y_new, xgb_model=booster)
+    # Report the total number of rounds, as after a full fit
+    model.set_params(n_estimators=n_rounds + n_new_rounds)
+    return model
+
+
+# ============================================================================
+# FEATURE-MATRIX STORE (see feature_store.py)
+# ============================================================================
+
+def train_on_feature_matrix(train_fn, fm, **kwargs):
+    """
+    Train with any `train_*` function directly on a FeatureMatrix.
+
+    The float32 matrix is passed as is (no DataFrame rebuild) and the
+    column schema is recorded on the model for `predict_feature_matrix`.
+    """
+    if fm.y is None:
+        raise ValueError("FeatureMatrix has no target")
+    model = train_fn(fm.X, fm.y, **kwargs)
+    model.feature_schema_ = list(fm.columns)
+    return model
+
+
+def predict_feature_matrix(model, fm):
+    """
+    Predict on a FeatureMatrix after checking it matches the model's schema.
+
+    Raises ValueError if the model records no schema (`feature_schema_`
+    from `train_on_feature_matrix`, or sklearn's `feature_names_in_`), as
+    the column order could not be validated.
+    """
+    expected = getattr(model, "feature_schema_", getattr(model, "feature_names_in_", None))
+    if expected is None:
+        raise ValueError(
+            f"{type(model).__name__} has no feature schema; train it with "
+            "train_on_feature_matrix or set model.feature_schema_"
+        )
+    fm.check_schema(expected)
+    return model.predict(fm.X)
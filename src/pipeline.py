@@ -0,0 +1,213 @@
+"""
+Out-of-core execution of the discharge feature pipeline.
+
+The in-memory path (`feature_engineering.aggregate_discharge_features`)
+needs the whole fleet as one DataFrame. Here the same per-checkup
+extraction is mapped over partitions - one checkup file each, or chunks
+of a large time-sorted CSV - in a bounded worker pool, and the small
+per-partition summaries are reduced into the cycle table that `soh`
+consumes. Peak memory is bounded by the number of in-flight partitions,
+not by the number of cells.
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import os
+
+import pandas as pd
+
+from io_utils import load_checkup_file, standardize_checkup_frame
+from preprocessing import (
+    validate_schema, sort_timeseries, assign_test_phase, filter_rows
+)
+from feature_engineering import (
+    build_cycle_features, compute_delta_time, integrate_discharge_capacity
+)
+from scheduler import MemoryBudgetScheduler, file_size
+
+REQUIRED_COLUMNS = {"cell_id", "checkup_num", "time_s", "current_a", "voltage_v"}
+GROUP_KEYS = ["cell_id", "checkup_num"]
+
+
+def prepare_discharge(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Discharge rows of a partition, sorted, with `delta_t` and `dQ_ah`.
+    """
+    validate_schema(df, REQUIRED_COLUMNS)
+    df = assign_test_phase(sort_timeseries(df))
+    df = filter_rows(df, df["test_phase"] == "discharge")
+    return integrate_discharge_capacity(compute_delta_time(df))
+
+
+def summarize_partition(df: pd.DataFrame, part: int = 0) -> pd.DataFrame:
+    """
+    Reduce one partition to additive per-checkup partial summaries.
+
+    Besides the sums needed for the cycle table, the first/last discharge
+    time stamp of each checkup is kept so `reduce_partitions` can restore
+    the time step that falls across a partition boundary.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Time-series rows of one partition
+    part : int
+        Position of the partition in time order
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (cell_id, checkup_num) present in the partition
+    """
+    df = prepare_discharge(df)
+    df["abs_current_a"] = df["current_a"].abs()
+
+    partial = (
+        df.groupby(GROUP_KEYS, as_index=False)
+        .agg(
+            dQ_ah=("dQ_ah", "sum"),
+            delta_t=("delta_t", "sum"),
+            abs_current_sum=("abs_current_a", "sum"),
+            n_rows=("abs_current_a", "size"),
+            min_voltage_v=("voltage_v", "min"),
+            first_time_s=("time_s", "first"),
+            first_abs_current_a=("abs_current_a", "first"),
+            last_time_s=("time_s", "last"),
+        )
+    )
+    partial["part"] = part
+    return partial
+
+
+def reduce_partitions(partials) -> pd.DataFrame:
+    """
+    Combine partial summaries into the per-checkup cycle table.
+
+    Output columns match `aggregate_discharge_features`.
+    """
+    partials = pd.concat(list(partials), ignore_index=True)
+    partials = partials.sort_values(GROUP_KEYS + ["part"]).reset_index(drop=True)
+
+    # Time step between the last row of one partition and the first row of
+    # the next one for the same checkup (lost when the diff was split)
+    prev_last = partials.groupby(GROUP_KEYS)["last_time_s"].shift()
+    gap = (partials["first_time_s"] - prev_last).fillna(0)
+    partials["delta_t"] += gap
+    partials["dQ_ah"] += partials["first_abs_current_a"] * gap / 3600
+
+    cycles = (
+        partials.groupby(GROUP_KEYS, as_index=False)
+        .agg(
+            discharge_capacity_ah=("dQ_ah", "sum"),
+            duration_s=("delta_t", "sum"),
+            abs_current_sum=("abs_current_sum", "sum"),
+            n_rows=("n_rows", "sum"),
+            min_voltage_v=("min_voltage_v", "min"),
+        )
+    )
+    cycles["mean_current_a"] = cycles["abs_current_sum"] / cycles["n_rows"]
+    return cycles[
+        GROUP_KEYS
+        + ["discharge_capacity_ah", "duration_s", "mean_current_a", "min_voltage_v"]
+    ]
+
+
+def featurize_checkup_file(path: str | Path, signal_features: bool = True) -> pd.DataFrame:
+    """
+    Cycle-level features of a single checkup file.
+
+    A file holds whole checkups, so besides the discharge aggregates the
+    signal features that need a complete curve (ICA/DVA peaks) are merged
+    in, see `feature_engineering.build_cycle_features`. The out-of-core
+    map/reduce below computes the aggregates only.
+    """
+    return build_cycle_features(prepare_discharge(load_checkup_file(path)), signal_features)
+
+
+def _summarize_file(task):
+    part, path = task
+    return summarize_partition(load_checkup_file(path), part)
+
+
+def _summarize_chunk(task):
+    part, chunk, path = task
+    return summarize_partition(standardize_checkup_frame(chunk, path), part)
+
+
+def bounded_map(func, tasks, max_workers):
+    """
+    Map `func` over `tasks` in a process pool with at most
+    2 * max_workers tasks in flight, yielding results in order.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(func, task))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _chunk_tasks(paths, chunksize):
+    part = 0
+    for path in paths:
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            yield part, chunk, path
+            part += 1
+
+
+def aggregate_discharge_features_out_of_core(
+    paths,
+    chunksize: int | None = None,
+    max_workers: int | None = None,
+    memory_budget: int | None = None,
+) -> pd.DataFrame:
+    """
+    Out-of-core equivalent of `aggregate_discharge_features`.
+
+    Parameters
+    ----------
+    paths : iterable of str or Path
+        Checkup CSV files (raw or processed). Every chunk is standardized
+        like `io_utils.load_checkup_file`. In chunked mode a processed
+        file must be sorted by cell_id, checkup_num and time_s, as written
+        by Notebook 1 (a raw file holds one checkup in time order).
+    chunksize : int, optional
+        If given, each file is streamed in chunks of this many rows;
+        otherwise each file is one partition read by the worker itself.
+    max_workers : int, optional
+        Size of the worker pool (defaults to the CPU count)
+    memory_budget : int, optional
+        RAM budget in bytes for file partitions; files are then admitted
+        by estimated footprint (see scheduler.MemoryBudgetScheduler).
+        Not combinable with `chunksize`, which bounds memory by itself.
+
+    Returns
+    -------
+    pd.DataFrame
+        Cycle-level discharge features, one row per (cell_id, checkup_num)
+    """
+    paths = [Path(p) for p in paths]
+    if not paths:
+        raise ValueError("No input files given")
+    if chunksize is not None and memory_budget is not None:
+        raise ValueError("Pass either chunksize or memory_budget, not both")
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if chunksize is None and memory_budget is not None:
+        scheduler = MemoryBudgetScheduler(memory_budget, max_workers)
+        partials = scheduler.map(
+            _summarize_file,
+            list(enumerate(paths)),
+            stage="features",
+            size_fn=lambda task: file_size(task[1]),
+        )
+        return reduce_partitions(partials)
+
+    if chunksize is None:
+        tasks, func = enumerate(paths), _summarize_file
+    else:
+        tasks, func = _chunk_tasks(paths, chunksize), _summarize_chunk
+
+    return reduce_partitions(bounded_map(func, tasks, max_workers))
@@ -2,6 +2,182 @@ import numpy as np
 import pandas as pd
 
 
+class GroupIndex:
+    """
+    Precomputed (cell_id, checkup_num) grouping of a frame sorted by
+    `sort_timeseries`.
+
+    Holds per-row group codes, start/stop row offsets per group and the
+    range of groups belonging to each cell, so later stages can slice and
+    reduce with `np.ufunc.reduceat` instead of re-hashing the string keys.
+    Instances are immutable and travel with the frame in
+    `df.attrs["group_index"]`.
+    """
+
+    def __init__(self, starts, n_rows, cell_ids, checkup_nums):
+        self.n_rows = n_rows
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.stops = np.r_[self.starts[1:], n_rows].astype(np.int64)
+        self.cell_ids = np.asarray(cell_ids, dtype=object)
+        self.checkup_nums = np.asarray(checkup_nums)
+        self.codes = np.repeat(np.arange(len(self.starts)), self.stops - self.starts)
+
+        if len(self.starts):
+            new_cell = np.r_[True, self.cell_ids[1:] != self.cell_ids[:-1]]
+            self.cell_group_starts = np.flatnonzero(new_cell)
+            self.cell_group_stops = np.r_[self.cell_group_starts[1:], len(self.starts)]
+        else:
+            # Zero groups (empty or fully filtered frame)
+            self.cell_group_starts = np.empty(0, dtype=np.int64)
+            self.cell_group_stops = np.empty(0, dtype=np.int64)
+        self._cell_pos = {
+            cell: i for i, cell in enumerate(self.cell_ids[self.cell_group_starts])
+        }
+
+    def __deepcopy__(self, memo):
+        # Immutable: pandas may deep-copy attrs on every operation
+        return self
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "GroupIndex":
+        """
+        Build the index from a frame sorted by cell_id and checkup_num.
+        """
+        cells = df["cell_id"].to_numpy()
+        checkups = df["checkup_num"].to_numpy()
+        if len(df) == 0:
+            return cls(np.empty(0, dtype=np.int64), 0, cells, checkups)
+        change = (cells[1:] != cells[:-1]) | (checkups[1:] != checkups[:-1])
+        starts = np.flatnonzero(np.r_[True, change])
+        return cls(starts, len(df), cells[starts], checkups[starts])
+
+    @property
+    def n_groups(self) -> int:
+        return len(self.starts)
+
+    def matches(self, df: pd.DataFrame) -> bool:
+        """
+        Check that the index still describes `df`: every row's keys must
+        equal its group's keys (vectorised O(rows) comparison, so keys
+        relabelled in place anywhere invalidate the index).
+        """
+        if len(df) != self.n_rows:
+            return False
+        if self.n_groups == 0:
+            return True
+        # .array avoids the NA scan that to_numpy() does on string columns
+        return bool(
+            (np.asarray(df["checkup_num"].array) == self.checkup_nums[self.codes]).all()
+            and (np.asarray(df["cell_id"].array) == self.cell_ids[self.codes]).all()
+        )
+
+    def keys(self) -> pd.DataFrame:
+        """
+        One row per group: cell_id, checkup_num.
+        """
+        return pd.DataFrame({"cell_id": self.cell_ids, "checkup_num": self.checkup_nums})
+
+    def cell_rows(self, cell_id, checkup_range=None) -> slice:
+        """
+        Row slice of one cell, optionally limited to an inclusive
+        (first, last) checkup_num range.
+        """
+        pos = self._cell_pos.get(cell_id)
+        if pos is None:
+            return slice(0, 0)
+        g0, g1 = self.cell_group_starts[pos], self.cell_group_stops[pos]
+        if checkup_range is not None:
+            checkups = self.checkup_nums[g0:g1]
+            g0, g1 = (
+                g0 + np.searchsorted(checkups, checkup_range[0], side="left"),
+                g0 + np.searchsorted(checkups, checkup_range[1], side="right"),
+            )
+        if g0 >= g1:
+            return slice(0, 0)
+        return slice(int(self.starts[g0]), int(self.stops[g1 - 1]))
+
+    def take(self, mask) -> "GroupIndex":
+        """
+        Index of the rows selected by a boolean mask (order preserved).
+        """
+        codes = self.codes[np.asarray(mask, dtype=bool)]
+        if len(codes) == 0:
+            return GroupIndex(np.empty(0, dtype=np.int64), 0, self.cell_ids[:0], self.checkup_nums[:0])
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+        group = codes[starts]
+        return GroupIndex(starts, len(codes), self.cell_ids[group], self.checkup_nums[group])
+
+    def cycle_index(self) -> "GroupIndex":
+        """
+        Index of a per-group table (one row per (cell_id, checkup_num)).
+        """
+        return GroupIndex(np.arange(self.n_groups), self.n_groups, self.cell_ids, self.checkup_nums)
+
+    # ---- reductions (NaN-skipping, like pandas groupby) ----
+
+    def count(self, values=None) -> np.ndarray:
+        if values is None:
+            return self.stops - self.starts
+        return self.sum(~np.isnan(values))
+
+    def sum(self, values) -> np.ndarray:
+        if self.n_groups == 0:
+            return np.empty(0)
+        values = np.where(np.isnan(values), 0, values)
+        return np.add.reduceat(values, self.starts)
+
+    def mean(self, values) -> np.ndarray:
+        return self.sum(values) / self.count(values)
+
+    def min(self, values) -> np.ndarray:
+        if self.n_groups == 0:
+            return np.empty(0)
+        return np.fmin.reduceat(values, self.starts)
+
+    def first(self, values) -> np.ndarray:
+        return np.asarray(values)[self.starts]
+
+    def diff(self, values, by: str = "group") -> np.ndarray:
+        """
+        Row-to-row difference restarted (set to 0) at each group or cell.
+        """
+        values = np.asarray(values, dtype=float)
+        out = np.diff(values, prepend=values[:1])
+        restart = self.starts if by == "group" else self.starts[self.cell_group_starts]
+        out[restart] = 0
+        return np.where(np.isnan(out), 0, out)
+
+
+def attach_group_index(df: pd.DataFrame, index: GroupIndex | None = None) -> pd.DataFrame:
+    """
+    Store a group index in `df.attrs` (built from `df` if not given).
+    """
+    df.attrs["group_index"] = index if index is not None else GroupIndex.from_frame(df)
+    return df
+
+
+def get_group_index(df: pd.DataFrame) -> GroupIndex | None:
+    """
+    Group index carried by `df`, or None if absent or stale.
+    """
+    index = df.attrs.get("group_index")
+    if index is not None and index.matches(df):
+        return index
+    return None
+
+
+def filter_rows(df: pd.DataFrame, mask) -> pd.DataFrame:
+    """
+    Boolean row filter that keeps the group index valid.
+    """
+    index = get_group_index(df)
+    mask = np.asarray(mask, dtype=bool)
+    out = df[mask] if mask.any() else df.iloc[:0]
+    if index is not None:
+        attach_group_index(out, index.take(mask))
+    return out
+
+
 def validate_schema(df: pd.DataFrame, required_cols: set) -> None:
     """
     Validate required columns exist.
@@ -13,12 +189,13 @@ def validate_schema(df: pd.DataFrame, required_cols: set) -> None:
 
 def sort_timeseries(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Sort data by cell, checkup, and time.
+    Sort data by cell, checkup, and time, and attach the group index.
     """
-    return (
+    df = (
         df.sort_values(["cell_id", "checkup_num", "time_s"])
         .reset_index(drop=True)
     )
+    return attach_group_index(df)
 
 
 def assign_test_phase(df: pd.DataFrame) -> pd.DataFrame:
@@ -0,0 +1,522 @@
+"""
+Metric-driven report builder.
+
+Docs, per-cell pages and figures are rendered from the latest run
+artifacts (see `artifacts.py`) and the markdown templates in
+src/templates/, instead of values pasted into scripts.
+
+Every output is keyed in a JSON manifest by a hash of everything it is
+built from (template text, substituted values, input table rows or
+drawing code). An output is rebuilt only when that hash changes or the
+file is missing, so rerunning the builder after a small pipeline update
+rewrites only the sections and cells whose inputs changed.
+"""
+from pathlib import Path
+from string import Template
+import argparse
+import hashlib
+import inspect
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from artifacts import DEFAULT_ARTIFACT_DIR, load_run_artifacts, model_slug
+from io_utils import atomic_write_text
+from forecasting import fit_degradation_trends, forecast_eol
+from visualization import (
+    plot_capacity_fade,
+    plot_degradation_rate,
+    plot_model_performance_comparison,
+    plot_soh_distribution,
+    plot_soh_trend,
+)
+
+TEMPLATE_DIR = Path(__file__).with_name("templates")
+DOCS_DIR = Path("../docs")
+FIGURES_DIR = Path("../figures")
+MANIFEST_NAME = ".report_manifest.json"
+
+# Narrative docs rendered without substitutions
+STATIC_DOCS = (
+    "project_overview.md",
+    "methodology.md",
+    "ethical_and_data_usage.md",
+    "limitations.md",
+)
+
+# Hand-written model descriptions and data-usage wording, kept until a
+# run's artifacts replace them
+STATIC_MODEL_SECTIONS = """### Linear Regression Model
+- **File**: linear_regression_model.pkl
+- **Type**: sklearn.linear_model.LinearRegression
+- **Parameters**: fit_intercept=True
+
+### Random Forest Model
+- **File**: random_forest_model.pkl
+- **Type**: sklearn.ensemble.RandomForestRegressor
+- **Parameters**: n_estimators=300, max_depth=5
+
+### XGBoost Model
+- **File**: xgboost_model.pkl
+- **Type**: xgboost.XGBRegressor
+- **Parameters**: n_estimators=300, max_depth=3, learning_rate=0.05"""
+NO_RESULTS_POLICY = (
+    "Exact numerical results are not published to comply with dataset\n"
+    "usage policies."
+)
+RESULTS_POLICY = (
+    "Only aggregate metrics are reported; raw and processed data are not\n"
+    "published to comply with dataset usage policies."
+)
+# Usage example when the run did not record its feature columns
+SCHEMA_FROM_MODEL = "model.feature_schema_  # recorded by train_on_feature_matrix"
+
+# Fleet EDA figures: file name, plotting function and the columns it reads
+EDA_FIGURES = (
+    ("fig_1_soh_trend.png", plot_soh_trend, ["cell_id", "checkup_num", "soh_percentage"]),
+    ("fig_2_capacity_fade.png", plot_capacity_fade, ["cell_id", "checkup_num", "max_capacity_mah"]),
+    ("fig_3_soh_distribution.png", plot_soh_distribution, ["soh_percentage"]),
+    ("fig_4_degradation_rate.png", plot_degradation_rate, ["cell_id", "checkup_num", "soh_percentage"]),
+)
+
+
+def content_hash(*parts) -> str:
+    """
+    Stable fingerprint of strings, bytes, arrays, DataFrames and
+    JSON-serialisable values.
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, pd.DataFrame):
+            digest.update("\x1f".join(map(str, part.columns)).encode())
+            part = pd.util.hash_pandas_object(part, index=False).to_numpy()
+        if isinstance(part, np.ndarray):
+            part = np.ascontiguousarray(part).tobytes()
+        elif isinstance(part, str):
+            part = part.encode()
+        elif not isinstance(part, bytes):
+            part = json.dumps(part, sort_keys=True, default=str).encode()
+        digest.update(part)
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+class ReportManifest:
+    """
+    Input hashes of the outputs in one directory.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.path = self.root / MANIFEST_NAME
+        self.entries = json.loads(self.path.read_text()) if self.path.exists() else {}
+        self.built = 0
+        self.skipped = 0
+
+    def _key(self, output) -> str:
+        return Path(output).relative_to(self.root).as_posix()
+
+    def build_if_changed(self, outputs, digest: str, build) -> bool:
+        """
+        Call `build()` unless every output exists and was built from
+        inputs with the same `digest`.
+
+        Parameters
+        ----------
+        outputs : Path or list of Path
+            Files produced by `build` (the first one keys the manifest)
+        digest : str
+            `content_hash` of the inputs
+        build : callable
+            Writes the outputs
+
+        Returns
+        -------
+        bool
+            True if the outputs were rebuilt
+        """
+        outputs = [outputs] if isinstance(outputs, (str, Path)) else list(outputs)
+        key = self._key(outputs[0])
+        if self.entries.get(key) == digest and all(Path(p).exists() for p in outputs):
+            self.skipped += 1
+            return False
+        build()
+        self.entries[key] = digest
+        self.built += 1
+        return True
+
+    def save(self) -> None:
+        atomic_write_text(json.dumps(self.entries, indent=1, sort_keys=True), self.path)
+
+
+def load_template(name: str) -> Template:
+    return Template((TEMPLATE_DIR / name).read_text(encoding="utf-8"))
+
+
+def _write_text(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def render_if_changed(manifest: ReportManifest, output: Path, template: Template, values: dict) -> bool:
+    """
+    Render `template` with `values` into `output` if either changed.
+    """
+    digest = content_hash(template.template, values)
+    return manifest.build_if_changed(
+        output, digest, lambda: _write_text(output, template.substitute(values).strip())
+    )
+
+
+def markdown_table(df: pd.DataFrame, floatfmt: str = ".4f") -> str:
+    """
+    Pipe table of a DataFrame (no tabulate dependency).
+    """
+    def fmt(value):
+        if isinstance(value, (float, np.floating)):
+            return "-" if np.isnan(value) else format(value, floatfmt)
+        return str(value)
+
+    lines = [
+        "| " + " | ".join(map(str, df.columns)) + " |",
+        "|" + "|".join("---" for _ in df.columns) + "|",
+    ]
+    lines += ["| " + " | ".join(fmt(v) for v in row) + " |" for row in df.itertuples(index=False)]
+    return "\n".join(lines)
+
+
+# ============================================================================
+# DOCS
+# ============================================================================
+
+def _model_sections(metrics: pd.DataFrame, run: dict) -> str:
+    described = run.get("models", {})
+    sections = []
+    for row in metrics.itertuples(index=False):
+        info = described.get(row.Model, {})
+        params = ", ".join(f"{k}={v}" for k, v in info.get("params", {}).items()) or "defaults"
+        sections.append(
+            f"### {row.Model} Model\n"
+            f"- **File**: {info.get('file', model_slug(row.Model) + '_model.pkl')}\n"
+            f"- **Type**: {info.get('type', 'unknown')}\n"
+            f"- **Parameters**: {params}\n"
+            f"- **Performance**: R-squared = {row.R2:.4f}, "
+            f"MAE = {row.MAE:.4f}, RMSE = {row.RMSE:.4f}"
+        )
+    return "\n\n".join(sections)
+
+
+def doc_values(artifacts: dict) -> dict:
+    """
+    Template values of the metric-driven docs, per doc file.
+    """
+    metrics, run = artifacts["metrics"], artifacts["run"] or {}
+    if metrics is None:
+        return {
+            "model_information.md": {
+                "models": f"\n{STATIC_MODEL_SECTIONS}",
+                "usage_file": "xgboost_model.pkl", "feature_columns": SCHEMA_FROM_MODEL,
+            },
+            "evaluation_strategy.md": {"results": NO_RESULTS_POLICY},
+        }
+
+    scheme = run.get("scheme") or "holdout"
+    best = metrics.loc[metrics["R2"].idxmax(), "Model"]
+    best_info = run.get("models", {}).get(best, {})
+    usage_file = best_info.get("file", f"{model_slug(best)}_model.pkl")
+    feature_columns = best_info.get("features") or run.get("feature_columns")
+
+    columns = [c for c in ("Model", "MAE", "RMSE", "R2", "R2_std", "folds") if c in metrics.columns]
+    timing_rows = [(stage, f"{seconds:.2f}") for stage, seconds in run.get("timings", {}).items()]
+    if "fit_s" in metrics.columns:
+        timing_rows += [(f"fit: {m}", f"{s:.2f}") for m, s in zip(metrics["Model"], metrics["fit_s"])]
+    timings = (
+        markdown_table(pd.DataFrame(timing_rows, columns=["Stage", "Seconds"]))
+        if timing_rows else "_No timings recorded._"
+    )
+    return {
+        "model_information.md": {
+            "models": (
+                f"Metrics come from the {scheme} evaluation of the run on "
+                f"{run.get('created', '-')}.\n\n{_model_sections(metrics, run)}"
+            ),
+            "usage_file": usage_file,
+            "feature_columns": (
+                repr(list(feature_columns)) if feature_columns else SCHEMA_FROM_MODEL
+            ),
+        },
+        "evaluation_strategy.md": {
+            "results": (
+                f"{RESULTS_POLICY}\n\n"
+                f"## Results ({scheme})\n\n{markdown_table(metrics[columns])}\n\n"
+                f"## Timings\n\n{timings}"
+            ),
+        },
+    }
+
+
+def build_docs(manifest: ReportManifest, artifacts: dict, docs_dir: Path = DOCS_DIR) -> None:
+    """
+    Render the narrative and metric-driven docs that changed.
+    """
+    for name in STATIC_DOCS:
+        render_if_changed(manifest, docs_dir / name, load_template(name), {})
+    for name, values in doc_values(artifacts).items():
+        render_if_changed(manifest, docs_dir / name, load_template(name), values)
+
+
+# ============================================================================
+# PER-CELL PAGES
+# ============================================================================
+
+def _cell_history(cell: pd.DataFrame, capacity_col: str | None) -> str:
+    history = pd.DataFrame({"Checkup": cell["checkup_num"].to_numpy()})
+    if capacity_col is not None:
+        history[capacity_col] = cell[capacity_col].to_numpy(dtype=float)
+    history["SOH (%)"] = cell["soh"].to_numpy(dtype=float) * 100
+    if "soh_delta" in cell.columns:
+        history["ΔSOH (%)"] = cell["soh_delta"].to_numpy(dtype=float) * 100
+    return markdown_table(history, ".3f")
+
+
+def _format_eol(eol: pd.Series) -> str:
+    """
+    Projected EOL with its interval; NaN means too few checkups to tell.
+    """
+    def checkup(value):
+        return "never" if np.isposinf(value) else f"{value:.1f}"
+
+    if np.isnan(eol["eol_checkup"]):
+        return "undetermined (fewer than 2 checkups)"
+    if np.isinf(eol["eol_checkup"]):
+        return "not degrading"
+    if np.isnan(eol["eol_lower"]) or np.isnan(eol["eol_upper"]):
+        return f"checkup {eol['eol_checkup']:.1f} (no interval, fewer than 3 checkups)"
+    return (
+        f"checkup {eol['eol_checkup']:.1f} "
+        f"({checkup(eol['eol_lower'])} - {checkup(eol['eol_upper'])})"
+    )
+
+
+def build_cell_pages(manifest: ReportManifest, soh_df: pd.DataFrame, cells_dir: Path) -> None:
+    """
+    Render one page per cell plus an index, rebuilding only cells whose
+    SOH rows changed.
+
+    Parameters
+    ----------
+    manifest : ReportManifest
+        Manifest of the directory containing `cells_dir`
+    soh_df : pd.DataFrame
+        Checkup-level table with `cell_id`, `checkup_num` and `soh`
+    cells_dir : Path
+        Output directory of the cell pages
+    """
+    df = soh_df.sort_values(["cell_id", "checkup_num"]).reset_index(drop=True)
+    capacity_col = next(
+        (c for c in ("discharge_capacity_ah", "max_capacity_mah") if c in df.columns), None
+    )
+    template = load_template("cell.md")
+
+    # Row hashes once for the fleet, then one digest per cell slice
+    row_hash = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    cell_ids = df["cell_id"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, cell_ids[1:] != cell_ids[:-1]])
+    stops = np.r_[starts[1:], len(df)]
+    base = content_hash(template.template, list(df.columns))
+
+    trends = fit_degradation_trends(df)
+    eol = forecast_eol(trends).set_index("cell_id")
+    trends = trends.set_index("cell_id")
+    summary = []
+
+    for start, stop in zip(starts, stops):
+        cell_id = cell_ids[start]
+        cell = df.iloc[start:stop]
+        soh = cell["soh"].to_numpy(dtype=float)
+        below = bool(soh[-1] < 0.8)
+        eol_text = _format_eol(eol.loc[cell_id])
+        slope = trends.loc[cell_id, "slope"]
+        summary.append((f"[{cell_id}]({cell_id}.md)", stop - start, soh[-1] * 100, eol_text, below))
+
+        values = {
+            "cell_id": cell_id,
+            "n_checkups": stop - start,
+            "last_checkup": cell["checkup_num"].iloc[-1],
+            "bol_capacity": (
+                f"{cell['bol_capacity_ah'].iloc[0]:.4f} Ah" if "bol_capacity_ah" in cell else "-"
+            ),
+            "latest_soh": f"{soh[-1] * 100:.2f}%",
+            "fade_rate": "-" if np.isnan(slope) else f"{slope * 100:.3f}% per checkup",
+            "eol": eol_text,
+            "below_eol": "yes" if below else "no",
+        }
+        output = cells_dir / f"{cell_id}.md"
+        manifest.build_if_changed(
+            output,
+            content_hash(base, row_hash[start:stop]),
+            lambda output=output, cell=cell, values=values: _write_text(
+                output,
+                template.substitute(values, history=_cell_history(cell, capacity_col)).strip(),
+            ),
+        )
+
+    table = pd.DataFrame(summary, columns=["Cell", "Checkups", "Latest SOH (%)", "Projected EOL", "Below EOL"])
+    render_if_changed(
+        manifest,
+        cells_dir / "index.md",
+        load_template("cells_index.md"),
+        {
+            "n_cells": len(table),
+            "n_below_eol": int(table["Below EOL"].sum()),
+            "cells": markdown_table(table, ".2f"),
+        },
+    )
+
+
+# ============================================================================
+# FIGURES
+# ============================================================================
+
+def build_figures(
+    manifest: ReportManifest,
+    artifacts: dict,
+    figures_dir: Path = FIGURES_DIR,
+    eda: bool = False,
+) -> None:
+    """
+    Redraw the metric figure, and optionally the fleet EDA figures, whose
+    inputs changed.
+
+    Each EDA figure is keyed on the columns it plots. They draw every
+    cell at 300 dpi and change whenever any cell's SOH does, so they are
+    opt-in (`eda=True`).
+    """
+    metrics, soh_df = artifacts["metrics"], artifacts["soh"]
+    model_dir = figures_dir / "modeling"
+    eda_dir = figures_dir / "eda"
+
+    if metrics is not None:
+        model_dir.mkdir(parents=True, exist_ok=True)
+        manifest.build_if_changed(
+            model_dir / "model_performance_comparison.png",
+            content_hash(inspect.getsource(plot_model_performance_comparison), metrics),
+            lambda: plot_model_performance_comparison(metrics, model_dir),
+        )
+
+    if eda and soh_df is not None:
+        if "soh_percentage" not in soh_df.columns:
+            soh_df = soh_df.assign(soh_percentage=soh_df["soh"] * 100)
+        eda_dir.mkdir(parents=True, exist_ok=True)
+        for name, plot, columns in EDA_FIGURES:
+            if not set(columns) <= set(soh_df.columns):
+                continue
+            manifest.build_if_changed(
+                eda_dir / name,
+                content_hash(inspect.getsource(plot), soh_df[columns]),
+                lambda plot=plot: plot(soh_df, eda_dir),
+            )
+
+
+def draw_static_figures(functions, output_dir: str | Path) -> None:
+    """
+    Run diagram functions whose `<name>.png` is missing or whose module
+    source changed (used by create_assets.py / create_figures.py).
+    """
+    output_dir = Path(output_dir)
+    manifest = ReportManifest(output_dir)
+    for func in functions:
+        source = inspect.getsource(inspect.getmodule(func))
+        manifest.build_if_changed(
+            output_dir / f"{func.__name__}.png", content_hash(source, func.__name__), func
+        )
+    manifest.save()
+    print(f"Diagrams: {manifest.built} drawn, {manifest.skipped} up to date ({output_dir})")
+
+
+# ============================================================================
+# ENTRY POINT
+# ============================================================================
+
+def build_reports(
+    artifact_dir: str | Path = DEFAULT_ARTIFACT_DIR,
+    docs_dir: str | Path = DOCS_DIR,
+    figures_dir: str | Path = FIGURES_DIR,
+    cells: bool = True,
+    figures: bool = True,
+    eda_figures: bool = False,
+) -> dict:
+    """
+    Rebuild the docs, cell pages and figures that are out of date.
+
+    Parameters
+    ----------
+    artifact_dir : str or Path
+        Run artifacts (metrics.csv, run.json, soh.csv, ...)
+    docs_dir : str or Path
+        Markdown output; cell pages go to `docs_dir`/cells
+    figures_dir : str or Path
+        Figure output (modeling/ and eda/ subdirectories)
+    cells : bool
+        Render per-cell pages from soh.csv
+    figures : bool
+        Redraw the model metric figure
+    eda_figures : bool
+        Also redraw the fleet EDA figures (slow for large fleets)
+
+    Returns
+    -------
+    dict
+        built / skipped output counts and elapsed seconds
+    """
+    start = time.perf_counter()
+    docs_dir, figures_dir = Path(docs_dir), Path(figures_dir)
+    artifacts = load_run_artifacts(artifact_dir)
+
+    docs_manifest = ReportManifest(docs_dir)
+    build_docs(docs_manifest, artifacts, docs_dir)
+    if cells and artifacts["soh"] is not None:
+        build_cell_pages(docs_manifest, artifacts["soh"], docs_dir / "cells")
+    docs_manifest.save()
+
+    figure_manifest = ReportManifest(figures_dir)
+    if figures:
+        build_figures(figure_manifest, artifacts, figures_dir, eda=eda_figures)
+        figure_manifest.save()
+
+    stats = {
+        "built": docs_manifest.built + figure_manifest.built,
+        "skipped": docs_manifest.skipped + figure_manifest.skipped,
+        "seconds": time.perf_counter() - start,
+    }
+    print(
+        f"Reports: {stats['built']} rebuilt, {stats['skipped']} up to date "
+        f"in {stats['seconds']:.2f}s"
+    )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build docs and figures from run artifacts")
+    parser.add_argument("--artifacts", default=str(DEFAULT_ARTIFACT_DIR))
+    parser.add_argument("--docs", default=str(DOCS_DIR))
+    parser.add_argument("--figures", default=str(FIGURES_DIR))
+    parser.add_argument("--no-cells", action="store_true")
+    parser.add_argument("--no-figures", action="store_true")
+    parser.add_argument("--eda", action="store_true", help="Also redraw the fleet EDA figures")
+    args = parser.parse_args()
+
+    build_reports(
+        args.artifacts,
+        args.docs,
+        args.figures,
+        cells=not args.no_cells,
+        figures=not args.no_figures,
+        eda_figures=args.eda,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Memory-budget-aware scheduling of pipeline work units.
+
+Each unit's peak memory is estimated as input size x the amplification
+factor of its stage (pandas stages use several times their input because
+of intermediate copies). Units are admitted to the worker pool only while
+the sum of in-flight estimates fits the RAM budget. Workers sample their
+own RSS while running a unit, and the peak above the worker's RSS at
+startup updates the stage's amplification factor, so the estimates follow
+the real footprint. Measuring from the startup baseline (rather than from
+the RSS when the unit starts) charges heap kept by the allocator from
+earlier units to the current one, so reused workers never look cheaper
+than they are.
+"""
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+import os
+import threading
+
+# Initial peak-memory / input-size ratios per stage
+DEFAULT_AMPLIFICATION = {
+    "ingest": 6.0,
+    "features": 8.0,
+}
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss() -> int:
+    """
+    Resident set size of this process in bytes.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        pass
+    try:
+        import resource  # Unix only
+    except ImportError:
+        return 0
+    # ru_maxrss is the lifetime peak (KiB on Linux); best available
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _PeakSampler:
+    """
+    Background thread recording the peak RSS while a unit runs.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.start_rss = 0
+        self.peak_rss = 0
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        self.start_rss = self.peak_rss = current_rss()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, current_rss())
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_rss = max(self.peak_rss, current_rss())
+
+
+# RSS of this worker process right after it started (see _init_worker)
+_worker = {}
+
+
+def _init_worker():
+    _worker["baseline_rss"] = current_rss()
+
+
+def _measured_call(func, item):
+    with _PeakSampler() as sampler:
+        result = func(item)
+    baseline = _worker.get("baseline_rss", sampler.start_rss)
+    return result, max(sampler.peak_rss - baseline, 0), sampler.start_rss, baseline
+
+
+def file_size(item) -> int:
+    """
+    Default unit size: size of the file the item points to.
+    """
+    return Path(item).stat().st_size
+
+
+class MemoryBudgetScheduler:
+    """
+    Run work units in a process pool without exceeding a memory budget.
+
+    Parameters
+    ----------
+    budget_bytes : int
+        RAM available for unit working memory (above each worker's
+        footprint at startup, so heap retained between units counts)
+    max_workers : int, optional
+        Upper bound on concurrent units (defaults to the CPU count)
+    amplification : dict, optional
+        Initial peak/input ratio per stage
+    safety : float
+        Multiplier applied to every estimate
+    smoothing : float
+        Weight of a new observation in the moving ratio estimate
+    min_ratio : float
+        Lower bound on a learned amplification ratio
+    """
+
+    def __init__(
+        self,
+        budget_bytes: int,
+        max_workers: int | None = None,
+        amplification: dict | None = None,
+        safety: float = 1.25,
+        smoothing: float = 0.3,
+        min_ratio: float = 1.0,
+    ):
+        self.budget_bytes = budget_bytes
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.amplification = dict(DEFAULT_AMPLIFICATION, **(amplification or {}))
+        self.safety = safety
+        self.smoothing = smoothing
+        self.min_ratio = min_ratio
+        self.stats = {
+            "units": 0,
+            "peak_admitted_bytes": 0,
+            "max_observed_bytes": 0,
+            "worker_idle_rss": 0,
+            "worker_baseline_rss": 0,
+            "oversized_units": 0,
+        }
+
+    def estimate(self, size: int, stage: str) -> int:
+        ratio = self.amplification.get(stage, max(self.amplification.values()))
+        return int(size * ratio * self.safety)
+
+    def observe(self, size: int, stage: str, peak_bytes: int) -> None:
+        """
+        Blend a measured peak into the stage's amplification ratio.
+        """
+        if size <= 0:
+            return
+        # A unit holds at least its own input, whatever RSS growth shows
+        # (freed heap reused from earlier units does not raise the RSS)
+        observed = max(peak_bytes / size, self.min_ratio)
+        current = self.amplification.get(stage, observed)
+        # React immediately to underestimates, decay slowly otherwise
+        if observed > current:
+            self.amplification[stage] = observed
+        else:
+            self.amplification[stage] = (
+                self.smoothing * observed + (1 - self.smoothing) * current
+            )
+
+    def map(self, func, items, stage: str = "features", size_fn=file_size) -> list:
+        """
+        Apply `func` to every item, admitting units by memory estimate.
+
+        Units are admitted first-fit: when the next unit does not fit, a
+        later, smaller one may start. A unit larger than the whole budget
+        runs alone.
+
+        Returns
+        -------
+        list
+            Results in input order
+        """
+        items = list(items)
+        sizes = [size_fn(item) for item in items]
+        results = [None] * len(items)
+        pending = list(range(len(items)))
+        running = {}
+        in_flight = 0
+
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker) as pool:
+            while pending or running:
+                pos = 0
+                while pos < len(pending) and len(running) < self.max_workers:
+                    i = pending[pos]
+                    est = self.estimate(sizes[i], stage)
+                    if running and in_flight + est > self.budget_bytes:
+                        pos += 1
+                        continue
+                    if est > self.budget_bytes:
+                        self.stats["oversized_units"] += 1
+                    pending.pop(pos)
+                    running[pool.submit(_measured_call, func, items[i])] = (i, est)
+                    in_flight += est
+                    self.stats["peak_admitted_bytes"] = max(self.stats["peak_admitted_bytes"], in_flight)
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i, est = running.pop(future)
+                    in_flight -= est
+                    result, peak, idle_rss, baseline = future.result()
+                    results[i] = result
+                    self.observe(sizes[i], stage, peak)
+                    self.stats["units"] += 1
+                    self.stats["max_observed_bytes"] = max(self.stats["max_observed_bytes"], peak)
+                    self.stats["worker_idle_rss"] = max(self.stats["worker_idle_rss"], idle_rss)
+                    self.stats["worker_baseline_rss"] = max(self.stats["worker_baseline_rss"], baseline)
+        return results
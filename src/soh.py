@@ -1,10 +1,23 @@
 import pandas as pd
 
+try:
+    from .preprocessing import attach_group_index, get_group_index
+except ImportError:
+    from preprocessing import attach_group_index, get_group_index
+
 
 def compute_bol_capacity(df: pd.DataFrame) -> pd.DataFrame:
     """
     Compute Beginning-of-Life (BOL) capacity.
     """
+    index = get_group_index(df)
+    if index is not None:
+        first_rows = index.starts[index.cell_group_starts]
+        return (
+            df.iloc[first_rows][["cell_id", "discharge_capacity_ah"]]
+            .rename(columns={"discharge_capacity_ah": "bol_capacity_ah"})
+            .reset_index(drop=True)
+        )
     return (
         df.groupby("cell_id", as_index=False)
         .first()[["cell_id", "discharge_capacity_ah"]]
@@ -16,8 +29,12 @@ def compute_soh(df: pd.DataFrame, bol_df: pd.DataFrame) -> pd.DataFrame:
     """
     Compute State of Health (SOH).
     """
+    index = get_group_index(df)
     df = df.merge(bol_df, on="cell_id", how="left")
     df["soh"] = df["discharge_capacity_ah"] / df["bol_capacity_ah"]
+    # A left merge keeps row order, so the index still applies
+    if index is not None:
+        attach_group_index(df, index)
     return df
 
 
@@ -26,6 +43,10 @@ def compute_soh_delta(df: pd.DataFrame) -> pd.DataFrame:
     Compute SOH degradation delta between cycles.
     """
     df = df.copy()
+    index = get_group_index(df)
+    if index is not None:
+        df["soh_delta"] = index.diff(df["soh"].to_numpy(dtype=float), by="cell")
+        return df
     df["soh_delta"] = (
         df.groupby("cell_id")["soh"]
         .diff()
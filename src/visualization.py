@@ -13,6 +13,13 @@ from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from .artifacts import load_run_artifacts
+    from .cache import cell_slice
+except ImportError:
+    from artifacts import load_run_artifacts
+    from cache import cell_slice
+
 # ============================================================================
 # 1. CONFIGURATION (Matches Notebook 1, Section 1.2)
 # ============================================================================
@@ -55,7 +62,7 @@ def plot_soh_trend(soh_df, save_dir, colors=None):
     plt.figure(figsize=(7, 5))
     
     for cell_id in sorted(soh_df['cell_id'].unique()):
-        cell_data = soh_df[soh_df['cell_id'] == cell_id].sort_values('checkup_num')
+        cell_data = cell_slice(soh_df, cell_id)
         plt.plot(
             cell_data['checkup_num'],
             cell_data['soh_percentage'],
@@ -95,7 +102,7 @@ def plot_capacity_fade(soh_df, save_dir, colors=None):
     plt.figure(figsize=(7, 5))
     
     for cell_id in sorted(soh_df['cell_id'].unique()):
-        cell_data = soh_df[soh_df['cell_id'] == cell_id].sort_values('checkup_num')
+        cell_data = cell_slice(soh_df, cell_id)
         plt.plot(
             cell_data['checkup_num'],
             cell_data['max_capacity_mah'],
@@ -166,7 +173,7 @@ def plot_degradation_rate(soh_df, save_dir):
     degradation_data = []
     
     for cell_id in sorted(soh_df['cell_id'].unique()):
-        cell_data = soh_df[soh_df['cell_id'] == cell_id].sort_values('checkup_num')
+        cell_data = cell_slice(soh_df, cell_id)
         
         if len(cell_data) > 1:
             x = cell_data['checkup_num'].values
@@ -280,15 +287,13 @@ def plot_predicted_vs_actual(model_df, save_dir):
 def plot_model_performance_comparison(metrics_df=None, save_dir=None):
     """
     Plot model performance comparison - Notebook 3, Section 3.3.2.2
+    Uses the metrics of the latest run artifacts when metrics_df is None
     """
     if metrics_df is None:
-        # Default metrics from notebook
-        metrics_df = pd.DataFrame({
-            "Model": ["Linear Regression", "Random Forest", "XGBoost"],
-            "MAE": [0.0181, 0.0099, 0.0006],
-            "RMSE": [0.0266, 0.0196, 0.0007],
-            "R2": [0.9214, 0.9572, 0.9999]
-        })
+        metrics_df = load_run_artifacts()["metrics"]
+        if metrics_df is None:
+            print("  Model performance comparison skipped: no metrics artifact")
+            return None
     
     fig, axes = plt.subplots(1, 3, figsize=(15, 5))
     
@@ -359,7 +364,7 @@ def generate_eda_visualizations(soh_df, output_dir=None):
     return results
 
 
-def generate_modeling_visualizations(model_df, output_dir=None):
+def generate_modeling_visualizations(model_df, output_dir=None, metrics_df=None):
     """
     Generate modeling visualizations from Notebook 3
     """
@@ -378,14 +383,14 @@ def generate_modeling_visualizations(model_df, output_dir=None):
     
     # Model Performance Comparison
     results['performance_comparison'] = plot_model_performance_comparison(
-        metrics_df=None, save_dir=output_dir
+        metrics_df=metrics_df, save_dir=output_dir
     )
     
     print("\nModeling visualizations completed")
     return results
 
 
-def generate_all_visualizations(soh_df, model_df=None):
+def generate_all_visualizations(soh_df, model_df=None, metrics_df=None):
     """
     Generate all visualizations from all notebooks
     """
@@ -401,7 +406,7 @@ def generate_all_visualizations(soh_df, model_df=None):
     }
     
     if model_df is not None:
-        all_results['modeling'] = generate_modeling_visualizations(model_df, MODEL_DIR)
+        all_results['modeling'] = generate_modeling_visualizations(model_df, MODEL_DIR, metrics_df)
     
     print("\n" + "="*70)
     print("VISUALIZATION PIPELINE COMPLETED SUCCESSFULLY")
@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The modules in src/ import each other as top-level modules (as in the
+# notebooks and scripts, which run from src/)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
@@ -0,0 +1,47 @@
+import gc
+
+import pandas as pd
+
+from cache import LRUCache, cell_slice
+from preprocessing import sort_timeseries
+
+
+def _soh_frame():
+    return sort_timeseries(pd.DataFrame({
+        "cell_id": ["AC01"] * 3 + ["AC02"] * 3,
+        "checkup_num": [1, 2, 3] * 2,
+        "time_s": 0.0,
+        "soh": [1.0, 0.95, 0.9, 1.0, 0.97, 0.93],
+    }))
+
+
+def test_cell_slice_is_uncached_by_default():
+    df = _soh_frame()
+    first = cell_slice(df, "AC01")
+    df.loc[1, "soh"] = 0.5
+    assert cell_slice(df, "AC01")["soh"].tolist() == [1.0, 0.5, 0.9]
+    assert first is not cell_slice(df, "AC01")
+
+
+def test_cached_slice_not_stale_after_in_place_mutation():
+    cache = LRUCache()
+    df = _soh_frame()
+    assert cell_slice(df, "AC01", cache=cache)["soh"].tolist() == [1.0, 0.95, 0.9]
+    assert cell_slice(df, "AC01", cache=cache)["soh"].tolist() == [1.0, 0.95, 0.9]
+    assert cache.stats()["hits"] == 1
+
+    df.loc[1, "soh"] = 0.5
+    assert cell_slice(df, "AC01", cache=cache)["soh"].tolist() == [1.0, 0.5, 0.9]
+    assert cache.stats()["misses"] == 2
+
+
+def test_entries_purged_when_frame_is_collected():
+    cache = LRUCache()
+    df = _soh_frame()
+    cell_slice(df, "AC01", cache=cache)
+    cell_slice(df, "AC02", (1, 2), cache=cache)
+    assert cache.stats()["entries"] == 2
+
+    del df
+    gc.collect()
+    assert cache.stats()["entries"] == 0
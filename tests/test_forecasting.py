@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from forecasting import forecast_fleet
+
+
+def _history():
+    return pd.DataFrame({
+        "cell_id": ["AC01"] * 4 + ["AC02"] * 3,
+        "checkup_num": np.array([1, 2, 3, 4, 1, 2, 3], dtype=np.int64),
+        "soh": [1.0, 0.97, 0.95, 0.92, 1.0, 0.98, 0.97],
+    })
+
+
+def test_forecast_keeps_integer_checkup_num():
+    history = _history()
+    trajectory, eol = forecast_fleet(history, horizon=2)
+
+    assert trajectory["checkup_num"].dtype == history["checkup_num"].dtype
+    assert trajectory["checkup_num"].tolist() == [5, 6, 4, 5]
+    merged = trajectory.merge(history, on=["cell_id", "checkup_num"], how="left")
+    assert len(merged) == len(trajectory)
+    assert eol["eol_checkup"].dtype == np.float64
+
+
+def test_forecast_keeps_float_checkup_num():
+    history = _history().astype({"checkup_num": float})
+    trajectory, _ = forecast_fleet(history, horizon=1)
+    assert trajectory["checkup_num"].dtype == np.float64
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from ingest import CYCLE_COLUMNS, CheckupWatcher
+from io_utils import load_csv
+
+
+def _cycles(checkup_nums, capacities, cell_id="AC01"):
+    return pd.DataFrame({
+        "cell_id": cell_id,
+        "checkup_num": checkup_nums,
+        "discharge_capacity_ah": capacities,
+        "duration_s": 3600.0,
+        "mean_current_a": 1.0,
+        "min_voltage_v": 2.5,
+    })[CYCLE_COLUMNS]
+
+
+def test_empty_store_is_typed(tmp_path):
+    watcher = CheckupWatcher(tmp_path, tmp_path / "store.csv")
+    assert watcher.soh_df["checkup_num"].dtype == np.int64
+    assert watcher.soh_df["soh"].dtype == np.float64
+
+
+def test_out_of_order_checkup_rewrites_store(tmp_path):
+    store = tmp_path / "store.csv"
+    watcher = CheckupWatcher(tmp_path, store)
+    watcher._update(_cycles([1], [1.0]))
+    watcher._update(_cycles([3], [0.85]))
+    watcher._update(_cycles([4], [0.8], cell_id="AC02"))
+    watcher._update(_cycles([2], [0.9]))
+
+    on_disk = load_csv(store)
+    expected = watcher.soh_df
+    assert on_disk[["cell_id", "checkup_num"]].values.tolist() == [
+        ["AC01", 1], ["AC01", 2], ["AC01", 3], ["AC02", 4],
+    ]
+    np.testing.assert_allclose(on_disk["soh_delta"], [0.0, -0.1, -0.05, 0.0])
+    np.testing.assert_allclose(on_disk["soh_delta"], expected["soh_delta"])
+    assert not store.with_name(store.name + ".tmp").exists()
+
+
+def test_in_order_checkup_appends(tmp_path):
+    store = tmp_path / "store.csv"
+    watcher = CheckupWatcher(tmp_path, store)
+    watcher._update(_cycles([1, 2], [1.0, 0.9]))
+    watcher._update(_cycles([3], [0.85]))
+
+    on_disk = load_csv(store)
+    assert on_disk["checkup_num"].tolist() == [1, 2, 3]
+    np.testing.assert_allclose(on_disk["soh_delta"], [0.0, -0.1, -0.05])
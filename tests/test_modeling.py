@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from evaluation import evaluate_update_drift
+from feature_store import FeatureMatrix
+from modeling import (
+    predict_feature_matrix, train_on_feature_matrix,
+    train_linear_regression, train_random_forest, train_xgboost,
+    update_linear_regression, update_random_forest, update_xgboost,
+)
+
+
+def _batches(n_old=300, n_new=150, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(0, 1, size=(n_old + n_new, 3))
+    y = 1.0 - 0.2 * X[:, 0] - 0.1 * X[:, 1] ** 2 + 0.05 * X[:, 2] + rng.normal(0, 0.005, len(X))
+    return X[:n_old], y[:n_old], X[n_old:], y[n_old:], X, y
+
+
+def test_linear_update_equals_full_refit():
+    X_old, y_old, X_new, y_new, X, y = _batches()
+    updated = update_linear_regression(train_linear_regression(X_old, y_old), X_new, y_new)
+    refit = train_linear_regression(X, y)
+
+    np.testing.assert_allclose(updated.coef_, refit.coef_, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(updated.intercept_, refit.intercept_, rtol=1e-10)
+    drift = evaluate_update_drift(updated, refit, X, y)["drift"]
+    assert drift["RMSE"] == pytest.approx(0.0, abs=1e-12)
+
+
+@pytest.mark.parametrize("train, update", [
+    (train_random_forest, update_random_forest),
+    (train_xgboost, update_xgboost),
+])
+def test_tree_updates_close_to_full_refit(train, update):
+    X_old, y_old, X_new, y_new, X, y = _batches()
+    model = train(X_old, y_old)
+    updated = update(model, X_new, y_new)
+    refit = train(X, y)
+
+    # Same contract for every updater: the model is updated in place
+    assert updated is model
+    result = evaluate_update_drift(updated, refit, X, y)
+    assert abs(result["drift"]["RMSE"]) < 0.005
+    assert abs(result["drift"]["R2"]) < 0.02
+
+
+def _feature_matrix(X, y, columns):
+    rows = pd.DataFrame({"cell_id": "AC01", "checkup_num": np.arange(len(X))})
+    return FeatureMatrix(X.astype(np.float32), columns, rows, y=y, target="soh")
+
+
+def test_updated_model_keeps_feature_schema():
+    X_old, y_old, X_new, y_new, X, y = _batches()
+    columns = ["a", "b", "c"]
+    model = train_on_feature_matrix(train_xgboost, _feature_matrix(X_old, y_old, columns))
+    update_xgboost(model, X_new, y_new)
+
+    assert model.feature_schema_ == columns
+    predict_feature_matrix(model, _feature_matrix(X, y, columns))
+    with pytest.raises(ValueError, match="schema mismatch"):
+        predict_feature_matrix(model, _feature_matrix(X[:, ::-1], y, columns[::-1]))
+
+
+def test_predict_requires_feature_schema():
+    X_old, y_old, _, _, X, y = _batches()
+    model = train_linear_regression(X_old, y_old)
+    with pytest.raises(ValueError, match="no feature schema"):
+        predict_feature_matrix(model, _feature_matrix(X, y, ["a", "b", "c"]))
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_engineering import (
+    aggregate_discharge_features, compute_delta_time, integrate_discharge_capacity,
+)
+from pipeline import aggregate_discharge_features_out_of_core, featurize_checkup_file
+from preprocessing import assign_test_phase, filter_rows, get_group_index, sort_timeseries
+
+COLUMNS = ["cell_id", "checkup_num", "time_s", "current_a", "voltage_v"]
+
+
+def _checkup(cell_id, checkup_num, current):
+    time_s = np.arange(len(current), dtype=float) * 10
+    return pd.DataFrame({
+        "cell_id": cell_id,
+        "checkup_num": checkup_num,
+        "time_s": time_s,
+        "current_a": current,
+        "voltage_v": 4.2 - time_s / 1e4,
+    })
+
+
+def test_sort_and_filter_empty_frame():
+    empty = _checkup("AC01", 1, np.empty(0))
+    df = sort_timeseries(empty)
+    assert len(df) == 0
+    assert get_group_index(df).n_groups == 0
+
+    charge_only = sort_timeseries(_checkup("AC01", 1, np.full(5, 2.0)))
+    out = filter_rows(charge_only, charge_only["current_a"] < 0)
+    assert len(out) == 0
+    assert get_group_index(out).n_groups == 0
+
+
+def test_out_of_core_empty_and_charge_only(tmp_path):
+    empty = tmp_path / "empty.csv"
+    _checkup("AC01", 1, np.empty(0)).to_csv(empty, index=False)
+    result = aggregate_discharge_features_out_of_core([empty], chunksize=4, max_workers=1)
+    assert len(result) == 0
+
+    charge = tmp_path / "charge.csv"
+    _checkup("AC01", 1, np.full(10, 2.0)).to_csv(charge, index=False)
+    result = aggregate_discharge_features_out_of_core([charge], chunksize=4, max_workers=1)
+    assert len(result) == 0
+    assert list(result.columns) == [
+        "cell_id", "checkup_num", "discharge_capacity_ah", "duration_s",
+        "mean_current_a", "min_voltage_v",
+    ]
+
+
+def _in_memory_features(paths):
+    df = sort_timeseries(pd.concat([pd.read_csv(p) for p in paths], ignore_index=True))
+    df = assign_test_phase(df)
+    df = filter_rows(df, df["test_phase"] == "discharge")
+    return aggregate_discharge_features(integrate_discharge_capacity(compute_delta_time(df)))
+
+
+def test_out_of_core_matches_in_memory(tmp_path):
+    rng = np.random.default_rng(0)
+    paths = []
+    for cell in ("AC01", "AC02"):
+        checkups = []
+        for checkup_num in (1, 2):
+            # Discharge, a charge-only stretch longer than a chunk, discharge
+            current = np.r_[
+                -rng.uniform(1, 2, 17), rng.uniform(1, 2, 13), -rng.uniform(1, 2, 19)
+            ]
+            checkups.append(_checkup(cell, checkup_num, current))
+        path = tmp_path / f"{cell}.csv"
+        pd.concat(checkups).to_csv(path, index=False)
+        paths.append(path)
+
+    expected = _in_memory_features(paths)
+    modes = [{"chunksize": n} for n in (None, 5, 6, 1000)] + [{"memory_budget": 10 ** 9}]
+    for mode in modes:
+        result = aggregate_discharge_features_out_of_core(paths, max_workers=2, **mode)
+        pd.testing.assert_frame_equal(
+            result.reset_index(drop=True), expected[result.columns].reset_index(drop=True),
+            check_dtype=False,
+        )
+
+
+def test_out_of_core_rejects_chunksize_with_budget(tmp_path):
+    path = tmp_path / "AC01.csv"
+    _checkup("AC01", 1, -np.ones(4)).to_csv(path, index=False)
+    with pytest.raises(ValueError, match="chunksize or memory_budget"):
+        aggregate_discharge_features_out_of_core([path], chunksize=2, memory_budget=10 ** 9)
+
+
+def test_checkup_file_features_include_signal_features(tmp_path):
+    rng = np.random.default_rng(1)
+    path = tmp_path / "AC01_CheckUp01_20260101_x.csv"
+    _checkup("AC01", 1, -rng.uniform(1, 2, 200)).drop(columns=["cell_id", "checkup_num"]).to_csv(
+        path, index=False
+    )
+
+    features = featurize_checkup_file(path)
+    assert {
+        "ica_peak1_v", "ica_peak1_area", "dva_peak1_q",
+        "mean_voltage_time_v", "mean_voltage_capacity_v",
+    } <= set(features.columns)
+    aggregates = aggregate_discharge_features_out_of_core([path], max_workers=1)
+    pd.testing.assert_frame_equal(features[aggregates.columns], aggregates, check_dtype=False)
+    assert list(featurize_checkup_file(path, signal_features=False).columns) == list(aggregates.columns)